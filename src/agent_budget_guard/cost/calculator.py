@@ -43,8 +43,7 @@ class CostCalculator:
         completion_tokens = response.usage.completion_tokens
 
         # Get pricing for this model
-        input_price = self._pricing.get_input_price(model, tier=tier)
-        output_price = self._pricing.get_output_price(model, tier=tier)
+        input_price, output_price = self._pricing.get_prices(model, tier=tier)
 
         # Calculate cost (prices are per 1K tokens)
         input_cost = (prompt_tokens / 1000.0) * input_price
@@ -75,8 +74,7 @@ class CostCalculator:
         prompt_tokens = response.usage.prompt_tokens
         completion_tokens = response.usage.completion_tokens
 
-        input_price = self._pricing.get_input_price(model, tier=tier)
-        output_price = self._pricing.get_output_price(model, tier=tier)
+        input_price, output_price = self._pricing.get_prices(model, tier=tier)
 
         input_cost = (prompt_tokens / 1000.0) * input_price
         output_cost = (completion_tokens / 1000.0) * output_price
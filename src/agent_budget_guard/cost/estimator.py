@@ -24,6 +24,9 @@ class CostEstimator:
         """
         self._pricing = pricing_table
 
+    def get_pricing_table(self) -> PricingTable:
+        return self._pricing
+
     def estimate_chat_completion_cost(
         self,
         model: str,
@@ -56,6 +59,37 @@ class CostEstimator:
         # Count input tokens using tiktoken
         input_tokens = count_message_tokens(messages, encoding_name)
 
+        return self.estimate_from_token_count(
+            model=model,
+            input_tokens=input_tokens,
+            max_tokens=max_tokens,
+            tier=tier,
+        )
+
+    def estimate_from_token_count(
+        self,
+        model: str,
+        input_tokens: int,
+        max_tokens: Optional[int] = None,
+        tier: str = "standard"
+    ) -> float:
+        """Estimate the cost of a call whose input token count is already known.
+
+        Skips tokenization entirely. Use this when the caller has counted
+        (or bounded) the prompt tokens itself.
+
+        Args:
+            model: Model name (e.g., "gpt-5.2", "gpt-4o-mini")
+            input_tokens: Number of input tokens in the prompt
+            max_tokens: Maximum completion tokens (if specified by user)
+            tier: Pricing tier ("standard" or "batch")
+
+        Returns:
+            Estimated cost in USD
+
+        Raises:
+            PricingDataError: If model pricing not found
+        """
         # Check if this is an o-series reasoning model
         is_reasoning = self._pricing.is_reasoning_model(model)
 
@@ -68,8 +102,7 @@ class CostEstimator:
         )
 
         # Get pricing
-        input_price = self._pricing.get_input_price(model, tier=tier)
-        output_price = self._pricing.get_output_price(model, tier=tier)
+        input_price, output_price = self._pricing.get_prices(model, tier=tier)
 
         # Calculate cost (prices are per 1K tokens)
         input_cost = (input_tokens / 1000.0) * input_price
@@ -116,8 +149,7 @@ class CostEstimator:
             is_reasoning_model=is_reasoning
         )
 
-        input_price = self._pricing.get_input_price(model, tier=tier)
-        output_price = self._pricing.get_output_price(model, tier=tier)
+        input_price, output_price = self._pricing.get_prices(model, tier=tier)
 
         input_cost = (input_tokens / 1000.0) * input_price
         output_cost = (output_tokens / 1000.0) * output_price
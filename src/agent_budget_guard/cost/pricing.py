@@ -1,11 +1,50 @@
 """Pricing configuration loader and manager."""
 
 import json
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from ..exceptions import PricingDataError
 
+# Per-table bound on memoized model-name resolutions
+_RESOLVE_CACHE_MAX = 1024
+
+_CONFIG_DIR = Path(__file__).parent.parent / "config"
+
+
+@lru_cache(maxsize=None)
+def _load_builtin_config(filename: str) -> Dict[str, Any]:
+    """Load and parse a built-in pricing file, once per process.
+
+    The returned dict is shared by every PricingTable built from the same
+    file, so it must never be mutated.
+
+    Args:
+        filename: Name of the JSON file in the package config directory
+
+    Returns:
+        Parsed pricing configuration
+    """
+    with open(_CONFIG_DIR / filename, "r") as f:
+        return _intern_names(json.load(f))
+
+
+def _intern_names(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Intern model names and alias targets in parsed pricing data.
+
+    Canonical names returned by model resolution are then the very same
+    objects as the ``models`` keys, so the follow-up dict lookup matches on
+    identity instead of comparing characters.
+    """
+    data["models"] = {sys.intern(name): spec for name, spec in data.get("models", {}).items()}
+    data["model_aliases"] = {
+        sys.intern(alias): sys.intern(target)
+        for alias, target in data.get("model_aliases", {}).items()
+    }
+    return data
+
 
 class PricingTable:
     """Manages LLM model pricing data for multiple providers.
@@ -13,12 +52,20 @@ class PricingTable:
     Loads pricing information from a JSON file and provides lookup methods
     for model pricing, encodings, and metadata.
 
+    Built-in provider tables are loaded lazily, on the first model lookup.
+    A custom ``config_path`` is loaded and validated immediately.
+
     Attributes:
-        _data: Raw pricing configuration data
+        _data: Raw pricing configuration data (None until loaded)
         _models: Model pricing dictionary
         _aliases: Model alias mappings
     """
 
+    __slots__ = (
+        "_resolve_cache", "_builtin_file", "_data", "_models", "_aliases", "_per_token",
+        "__weakref__",
+    )
+
     _PROVIDER_CONFIG_FILES = {
         "openai": "pricing.json",
         "anthropic": "pricing_anthropic.json",
@@ -41,34 +88,70 @@ class PricingTable:
                      backward compatibility.
 
         Raises:
-            PricingDataError: If pricing file cannot be loaded or is malformed
+            PricingDataError: If the provider is unknown, or a custom pricing
+                file cannot be loaded or is malformed
         """
+        # model name as given -> canonical model name
+        self._resolve_cache: Dict[str, str] = {}
+
         if config_path is None:
-            config_dir = Path(__file__).parent.parent / "config"
             filename = self._PROVIDER_CONFIG_FILES.get(provider)
             if filename is None:
                 raise PricingDataError(
                     f"Unknown provider '{provider}'. "
                     f"Supported: {', '.join(self._PROVIDER_CONFIG_FILES)}"
                 )
-            config_path = config_dir / filename
-        else:
-            config_path = Path(config_path)
+            # Built-in tables are loaded on the first model lookup, so a
+            # session that never prices a call never reads the file
+            self._builtin_file: Optional[str] = filename
+            self._data: Optional[Dict[str, Any]] = None
+            return
 
+        self._builtin_file = None
         try:
-            with open(config_path, "r") as f:
-                self._data: Dict[str, Any] = json.load(f)
+            with open(Path(config_path), "r") as f:
+                data = _intern_names(json.load(f))
         except (FileNotFoundError, json.JSONDecodeError) as e:
             raise PricingDataError(f"Failed to load pricing configuration: {e}") from e
+        self._set_data(data)
 
-        self._models: Dict[str, Dict[str, Any]] = self._data.get("models", {})
-        self._aliases: Dict[str, str] = self._data.get("model_aliases", {})
-
-        if not self._models:
+    def _set_data(self, data: Dict[str, Any]) -> None:
+        """Install parsed pricing data and validate that it has models."""
+        models: Dict[str, Dict[str, Any]] = data.get("models", {})
+        if not models:
             raise PricingDataError("Pricing configuration contains no models")
+        self._models = models
+        self._aliases: Dict[str, str] = data.get("model_aliases", {})
+        # (model, tier) -> (input, output) USD per single token, so hot paths
+        # do one flat lookup and skip the per-1K division
+        self._per_token: Dict[Tuple[str, str], Tuple[float, float]] = {
+            (name, tier): (
+                float(prices["input_price_per_1k"]) / 1000.0,
+                float(prices["output_price_per_1k"]) / 1000.0,
+            )
+            for name, spec in models.items()
+            for tier, prices in spec.items()
+            if isinstance(prices, dict)
+            and "input_price_per_1k" in prices
+            and "output_price_per_1k" in prices
+        }
+        self._data = data
+
+    @staticmethod
+    def clear_builtin_cache() -> None:
+        """Drop the parsed built-in pricing files shared by all tables."""
+        _load_builtin_config.cache_clear()
+
+    def _load_builtin(self) -> None:
+        """Load this table's built-in pricing file (shared across instances)."""
+        try:
+            data = _load_builtin_config(self._builtin_file)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            raise PricingDataError(f"Failed to load pricing configuration: {e}") from e
+        self._set_data(data)
 
     def _resolve_model(self, model: str) -> str:
-        """Resolve model alias to canonical model name.
+        """Resolve model alias to canonical model name, memoized per table.
 
         Args:
             model: Model name or alias
@@ -79,20 +162,48 @@ class PricingTable:
         Raises:
             PricingDataError: If model not found in pricing data
         """
-        # Check if it's an alias first
-        if model in self._aliases:
-            return self._aliases[model]
+        canonical = self._resolve_cache.get(model)
+        if canonical is None:
+            # Every lookup goes through here before touching _models, and
+            # the cache is empty until data is loaded
+            if self._data is None:
+                self._load_builtin()
+            canonical = sys.intern(self._lookup_model(model))
+            if len(self._resolve_cache) >= _RESOLVE_CACHE_MAX:
+                self._resolve_cache.clear()
+            self._resolve_cache[model] = canonical
+        return canonical
+
+    def _lookup_model(self, model: str) -> str:
+        """Resolve model alias to canonical model name.
 
-        # Check if it's a known model
+        Args:
+            model: Model name or alias
+
+        Returns:
+            Canonical model name
+
+        Raises:
+            PricingDataError: If model not found in pricing data
+        """
+        # Exact model names are by far the most common input, so check them first
         if model in self._models:
             return model
 
+        # Then aliases
+        alias_target = self._aliases.get(model)
+        if alias_target is not None:
+            return alias_target
+
         # Try to match versioned models like gpt-4-0314 or gpt-4o-mini-2024-07-18 to their base model.
         # E.g., gpt-4o-mini-2024-07-18 -> gpt-4o-mini
-        parts = model.split("-")
-        # Try stripping numeric 'version/date' suffixes step by step
-        for i in range(len(parts), 0, -1):
-            candidate = "-".join(parts[:i])
+        # Try stripping numeric 'version/date' suffixes step by step, dropping
+        # one "-" segment per pass without rebuilding the string from parts
+        candidate = model
+        while True:
+            candidate, sep, _ = candidate.rpartition("-")
+            if not sep:
+                break
             if candidate in self._models:
                 return candidate
 
@@ -165,6 +276,67 @@ class PricingTable:
 
         return float(tier_data["output_price_per_1k"])
 
+    def get_prices(self, model: str, tier: str = "standard") -> Tuple[float, float]:
+        """Get input and output token prices for a model in one lookup.
+
+        Resolves the model name and tier once, rather than once per price as
+        separate get_input_price() and get_output_price() calls would.
+
+        Args:
+            model: Model name (can be an alias)
+            tier: Pricing tier ("standard" or "batch")
+
+        Returns:
+            Tuple of (input, output) prices per 1,000 tokens in USD
+
+        Raises:
+            PricingDataError: If model not found or a price is missing
+        """
+        canonical_model = self._resolve_model(model)
+        model_data = self._models[canonical_model]
+
+        # Get pricing for the specified tier (default to standard)
+        if tier not in model_data:
+            tier = "standard"
+
+        tier_data = model_data.get(tier, {})
+
+        if "input_price_per_1k" not in tier_data:
+            raise PricingDataError(
+                f"Input price not found for model '{canonical_model}' tier '{tier}'"
+            )
+        if "output_price_per_1k" not in tier_data:
+            raise PricingDataError(
+                f"Output price not found for model '{canonical_model}' tier '{tier}'"
+            )
+
+        return float(tier_data["input_price_per_1k"]), float(tier_data["output_price_per_1k"])
+
+    def get_per_token(self, model: str, tier: str = "standard") -> Tuple[float, float]:
+        """Get input and output prices for a model in USD per single token.
+
+        Read from a table precomputed at load time, so cost is simply
+        ``input_tokens * input_rate + output_tokens * output_rate``.
+
+        Args:
+            model: Model name (can be an alias)
+            tier: Pricing tier ("standard" or "batch")
+
+        Returns:
+            Tuple of (input, output) prices per token in USD
+
+        Raises:
+            PricingDataError: If model not found or a price is missing
+        """
+        # Resolve first: it loads a lazily-loaded table before _per_token is read
+        canonical_model = self._resolve_model(model)
+        rates = self._per_token.get((canonical_model, tier))
+        if rates is None:
+            # Tier fallback and missing-price errors are handled by get_prices()
+            input_price, output_price = self.get_prices(model, tier)
+            rates = (input_price / 1000.0, output_price / 1000.0)
+        return rates
+
     def get_model_encoding(self, model: str) -> str:
         """Get tiktoken encoding name for a model.
 
@@ -1,5 +1,7 @@
 """Custom exceptions for agent-budget-guard library."""
 
+from typing import Optional
+
 
 class BudgetError(Exception):
     """Base exception for budget-related errors."""
@@ -18,18 +20,33 @@ class BudgetExceededError(BudgetError):
         remaining: The remaining budget available when the error was raised
     """
 
-    def __init__(self, message: str, estimated_cost: float, remaining: float) -> None:
+    def __init__(
+        self, message: Optional[str], estimated_cost: float, remaining: float
+    ) -> None:
         """Initialize BudgetExceededError.
 
         Args:
-            message: Human-readable error message
+            message: Human-readable error message, or None to build the
+                default one from the amounts the first time it is needed
             estimated_cost: Estimated cost of the blocked request in USD
             remaining: Remaining budget in USD
         """
-        super().__init__(message)
+        # The message is formatted lazily: callers that catch the error and
+        # only look at the amounts never pay for it. args carries the raw
+        # fields so repr() and pickling see the amounts.
+        super().__init__(message, estimated_cost, remaining)
+        self._message = message
         self.estimated_cost = estimated_cost
         self.remaining = remaining
 
+    def __str__(self) -> str:
+        if self._message is None:
+            self._message = (
+                f"Estimated cost ${self.estimated_cost:.6f} would exceed "
+                f"remaining budget ${self.remaining:.6f}"
+            )
+        return self._message
+
 
 class PricingDataError(BudgetError):
     """Raised when pricing data is missing or invalid.
@@ -54,8 +54,7 @@ class AnthropicProvider(BaseProvider):
             # Conservative: at least 1024 or 50% of input, whichever is larger
             output_tokens = max(1024, int(input_tokens * 0.5))
 
-        input_price = self._pricing.get_input_price(model, tier=tier)
-        output_price = self._pricing.get_output_price(model, tier=tier)
+        input_price, output_price = self._pricing.get_prices(model, tier=tier)
 
         return (input_tokens / 1000.0) * input_price + (output_tokens / 1000.0) * output_price
 
@@ -74,8 +73,7 @@ class AnthropicProvider(BaseProvider):
         input_tokens: int = response.usage.input_tokens
         output_tokens: int = response.usage.output_tokens
 
-        input_price = self._pricing.get_input_price(actual_model, tier=tier)
-        output_price = self._pricing.get_output_price(actual_model, tier=tier)
+        input_price, output_price = self._pricing.get_prices(actual_model, tier=tier)
 
         return (input_tokens / 1000.0) * input_price + (output_tokens / 1000.0) * output_price
 
@@ -74,8 +74,7 @@ class GoogleProvider(BaseProvider):
         else:
             output_tokens = max(1024, int(input_tokens * 0.5))
 
-        input_price = self._pricing.get_input_price(model, tier=tier)
-        output_price = self._pricing.get_output_price(model, tier=tier)
+        input_price, output_price = self._pricing.get_prices(model, tier=tier)
 
         return (input_tokens / 1000.0) * input_price + (output_tokens / 1000.0) * output_price
 
@@ -105,8 +104,7 @@ class GoogleProvider(BaseProvider):
         input_tokens: int = metadata.prompt_token_count or 0
         output_tokens: int = metadata.candidates_token_count or 0
 
-        input_price = self._pricing.get_input_price(model, tier=tier)
-        output_price = self._pricing.get_output_price(model, tier=tier)
+        input_price, output_price = self._pricing.get_prices(model, tier=tier)
 
         return (input_tokens / 1000.0) * input_price + (output_tokens / 1000.0) * output_price
 
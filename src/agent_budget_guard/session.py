@@ -1,8 +1,8 @@
 """Main entry point for budget-controlled LLM API sessions."""
 
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, List, Optional, Tuple
 
-from .tracking.tracker import SpendTracker
+from .tracking.tracker import create_tracker
 from .cost.pricing import PricingTable
 from .cost.estimator import CostEstimator
 from .cost.calculator import CostCalculator
@@ -51,6 +51,11 @@ class BudgetedSession:
         >>> client = session.wrap_openai(OpenAI())
     """
 
+    __slots__ = (
+        "_tracker", "_pricing", "_estimator", "_calculator", "_tier",
+        "_on_budget_exceeded", "_on_warning", "_warning_thresholds", "__weakref__",
+    )
+
     def __init__(
         self,
         budget_usd: float,
@@ -72,7 +77,8 @@ class BudgetedSession:
                 returns None instead of raising.
             on_warning: Optional callback when utilization crosses a threshold.
                 Called with a dict: {"threshold": int, "spent": float,
-                "remaining": float, "budget": float}.
+                "remaining": float, "budget": float}. Each call receives
+                a fresh dict, so the callback may keep it.
             warning_thresholds: Utilization % levels that trigger on_warning.
                 Defaults to [30, 80, 95].
 
@@ -80,7 +86,9 @@ class BudgetedSession:
             ValueError: If budget is negative
             PricingDataError: If pricing config cannot be loaded
         """
-        self._tracker = SpendTracker(budget_usd)
+        self._tracker = create_tracker(budget_usd)
+        # Built-in tables load lazily from one parsed copy per process, so
+        # building one per session does no file I/O
         self._pricing = PricingTable(config_path=pricing_config)
         self._estimator = CostEstimator(self._pricing)
         self._calculator = CostCalculator(self._pricing)
@@ -88,7 +96,16 @@ class BudgetedSession:
         self._on_budget_exceeded = on_budget_exceeded
         self._on_warning = on_warning
         self._warning_thresholds = sorted(warning_thresholds or DEFAULT_WARNING_THRESHOLDS)
-        self._fired_thresholds: set = set()
+
+    @staticmethod
+    def clear_pricing_cache() -> None:
+        """Drop the parsed built-in pricing files cached for the process.
+
+        Pricing tables that have not loaded yet, including those of sessions
+        created afterwards, re-read the files. Tables that already priced a
+        call keep the data they hold.
+        """
+        PricingTable.clear_builtin_cache()
 
     # ------------------------------------------------------------------ #
     # Factory class methods                                                #
@@ -423,7 +440,6 @@ class BudgetedSession:
             on_budget_exceeded=self._on_budget_exceeded,
             on_warning=self._on_warning,
             warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
         )
 
     def wrap_anthropic(self, client: Any, tier: Optional[str] = None) -> Any:
@@ -454,7 +470,6 @@ class BudgetedSession:
             on_budget_exceeded=self._on_budget_exceeded,
             on_warning=self._on_warning,
             warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
         )
 
     def wrap_async_openai(self, client: Any, tier: Optional[str] = None) -> Any:
@@ -480,7 +495,6 @@ class BudgetedSession:
             on_budget_exceeded=self._on_budget_exceeded,
             on_warning=self._on_warning,
             warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
         )
 
     def wrap_async_anthropic(self, client: Any, tier: Optional[str] = None) -> Any:
@@ -507,7 +521,6 @@ class BudgetedSession:
             on_budget_exceeded=self._on_budget_exceeded,
             on_warning=self._on_warning,
             warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
         )
 
     def wrap_async_google(self, client: Any, tier: Optional[str] = None) -> Any:
@@ -536,7 +549,6 @@ class BudgetedSession:
             on_budget_exceeded=self._on_budget_exceeded,
             on_warning=self._on_warning,
             warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
         )
 
     def wrap_google(self, client: Any, tier: Optional[str] = None) -> Any:
@@ -567,7 +579,6 @@ class BudgetedSession:
             on_budget_exceeded=self._on_budget_exceeded,
             on_warning=self._on_warning,
             warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
         )
 
     # ------------------------------------------------------------------ #
@@ -611,6 +622,15 @@ class BudgetedSession:
         """
         return self._tracker.get_reserved()
 
+    def get_snapshot(self) -> Tuple[float, float]:
+        """Get spent and reserved amounts in a single consistent read.
+
+        Returns:
+            Tuple of (spent, reserved) in USD
+        """
+        _, spent, reserved = self._tracker.snapshot()
+        return spent, reserved
+
     def reset(self) -> None:
         """Reset spent and reserved amounts to zero.
 
@@ -636,12 +656,10 @@ class BudgetedSession:
                 - remaining: Remaining budget in USD
                 - utilization_percent: Percentage of budget used (spent + reserved)
         """
-        budget = self._tracker.get_budget()
-        spent = self._tracker.get_spent()
-        reserved = self._tracker.get_reserved()
-        remaining = self._tracker.get_remaining()
+        budget, spent, reserved = self._tracker.snapshot()
+        remaining = budget - spent - reserved
 
-        utilization = ((spent + reserved) / budget * 100) if budget > 0 else 0.0
+        utilization = (spent + reserved) * self._tracker.get_utilization_scale()
 
         return {
             "budget": budget,
@@ -1,11 +1,25 @@
 """Thread-safe budget tracking with reservation system."""
 
+import itertools
 import threading
-import uuid
-from typing import Dict
+from typing import Dict, List, Sequence, Tuple, Union
 
 from ..exceptions import BudgetExceededError
 
+# Amounts are kept as integer nano-dollars so that many small commits add
+# up exactly instead of accumulating float rounding error
+_NANOS_PER_USD = 1_000_000_000
+
+
+# Direct-mapped cache of recently refused reservation amounts; a power of
+# two so the slot is a mask of the amount
+_REFUSED_CACHE_SIZE = 512
+
+
+def _to_nanos(usd: float) -> int:
+    """Convert a USD amount to whole nano-dollars."""
+    return round(usd * _NANOS_PER_USD)
+
 
 class SpendTracker:
     """Thread-safe budget tracker with reservation system.
@@ -17,14 +31,39 @@ class SpendTracker:
     This ensures that even with concurrent API calls, the budget is never
     exceeded.
 
+    The methods are plain synchronous calls and are safe to use from
+    coroutines: each critical section is a few arithmetic operations with
+    no I/O or awaits, so the lock is held only briefly and never across a
+    suspension point. A single tracker may be shared by sync and async
+    clients, which is why it uses a threading lock rather than an asyncio one.
+
+    Amounts are stored internally as integer nano-dollars and converted
+    to USD floats at the method boundary.
+
+    Getters that read a single field (get_spent, get_reserved, get_budget)
+    take no lock; reads that combine fields (get_remaining, snapshot) do,
+    so they never mix values from before and after an update.
+
     Attributes:
         _budget: Total budget in USD
-        _spent: Amount actually spent so far
-        _reserved: Amount currently reserved (pending API calls)
-        _reservations: Map of reservation_id -> reserved amount
+        _budget_nanos: Total budget in nano-dollars (inf if unlimited)
+        _spent_nanos: Amount actually spent so far, in nano-dollars
+        _reserved_nanos: Amount currently reserved (pending API calls), in nano-dollars
+        _reservations: Map of reservation_id -> reserved nano-dollars
+        _ids: Source of reservation IDs, increasing and never reused
+        _generation: Bumped whenever the remaining budget grows
+        _refused: Direct-mapped cache of (amount, generation) for refused
+            reservations, so identical retries fail without the lock
+        _fired_mask: Bitmask of warning thresholds that have already fired
+        _pct_per_usd: Percent of the budget one USD represents (0 if unbounded)
         _lock: Threading lock for atomic operations
     """
 
+    __slots__ = (
+        "_budget", "_budget_nanos", "_spent_nanos", "_reserved_nanos", "_reservations", "_ids",
+        "_generation", "_refused", "_fired_mask", "_pct_per_usd", "_lock", "__weakref__",
+    )
+
     def __init__(self, budget_usd: float) -> None:
         """Initialize SpendTracker.
 
@@ -38,9 +77,24 @@ class SpendTracker:
             raise ValueError("Budget cannot be negative")
 
         self._budget = float(budget_usd)
-        self._spent = 0.0
-        self._reserved = 0.0
-        self._reservations: Dict[str, float] = {}
+        # An unlimited budget stays a float inf; int - int and inf - int both
+        # compare correctly against a cost
+        self._budget_nanos: Union[int, float] = (
+            self._budget if self._budget == float("inf") else _to_nanos(self._budget)
+        )
+        self._spent_nanos = 0
+        self._reserved_nanos = 0
+        self._reservations: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._generation = 0
+        self._refused: List[Tuple[int, int]] = [(-1, -1)] * _REFUSED_CACHE_SIZE
+        self._fired_mask = 0
+        # The budget never changes, so utilization is a multiply, not a divide.
+        # A zero or infinite budget reports 0% utilization.
+        if 0 < self._budget < float("inf"):
+            self._pct_per_usd = 100.0 / self._budget
+        else:
+            self._pct_per_usd = 0.0
         self._lock = threading.Lock()
 
     def check_and_reserve(self, estimated_cost: float) -> str:
@@ -54,29 +108,91 @@ class SpendTracker:
             estimated_cost: Estimated cost of the API call in USD
 
         Returns:
-            Reservation ID (UUID) to use for commit/rollback
+            Reservation ID (an opaque string, unique within this tracker) to use
+            for commit/rollback
 
         Raises:
             BudgetExceededError: If estimated cost would exceed remaining budget
         """
+        # Everything that doesn't read or write shared state happens outside
+        # the lock, so the critical section is just the check and the update
+        cost_nanos = _to_nanos(estimated_cost)
+
+        # Unlocked fast refusals. A concurrent commit can only make this read
+        # overstate what is left, never understate it, so refusing on it is
+        # safe; anything that might fit is decided under the lock below.
+        remaining_nanos = self._budget_nanos - self._spent_nanos - self._reserved_nanos
+        # An exhausted budget can't cover any call, and remaining budget only
+        # shrinks between generations, so an amount refused in the current
+        # generation is still refused. Wrappers still estimate before calling
+        # this on an exhausted budget, so the error carries the call's real
+        # cost; only the refusal itself is cheap.
+        slot = cost_nanos & (_REFUSED_CACHE_SIZE - 1)
+        if (remaining_nanos <= 0 < cost_nanos
+                or self._refused[slot] == (cost_nanos, self._generation)):
+            raise BudgetExceededError(
+                None,
+                estimated_cost=estimated_cost,
+                remaining=remaining_nanos / _NANOS_PER_USD,
+            )
+
         with self._lock:  # ATOMIC OPERATION - prevents race conditions
             # Calculate remaining budget considering both spent and reserved
-            remaining = self._budget - self._spent - self._reserved
+            remaining_nanos = self._budget_nanos - self._spent_nanos - self._reserved_nanos
+            exceeded = cost_nanos > remaining_nanos
+            if exceeded:
+                self._refused[slot] = (cost_nanos, self._generation)
+            else:
+                # Reserve the budget. IDs come from a counter rather than
+                # uuid4(), which reads the OS random source on every call;
+                # drawing it under the lock keeps it unique without the GIL.
+                reservation_id = str(next(self._ids))
+                self._reserved_nanos += cost_nanos
+                self._reservations[reservation_id] = cost_nanos
+
+        if exceeded:
+            raise BudgetExceededError(
+                None,
+                estimated_cost=estimated_cost,
+                remaining=remaining_nanos / _NANOS_PER_USD,
+            )
+        return reservation_id
+
+    def check_and_reserve_many(self, estimated_costs: Sequence[float]) -> List[str]:
+        """Atomically reserve funds for several API calls at once.
+
+        All-or-nothing: either every cost is reserved or, if their total
+        would exceed the remaining budget, none is. Takes the lock once for
+        the whole batch.
 
-            if estimated_cost > remaining:
-                raise BudgetExceededError(
-                    f"Estimated cost ${estimated_cost:.6f} would exceed "
-                    f"remaining budget ${remaining:.6f}",
-                    estimated_cost=estimated_cost,
-                    remaining=remaining
-                )
+        Args:
+            estimated_costs: Estimated cost of each API call in USD
 
-            # Reserve the budget
-            reservation_id = str(uuid.uuid4())
-            self._reserved += estimated_cost
-            self._reservations[reservation_id] = estimated_cost
+        Returns:
+            One reservation ID per cost, in the same order, each committed or
+            rolled back individually
 
-            return reservation_id
+        Raises:
+            BudgetExceededError: If the total would exceed remaining budget
+        """
+        costs_nanos = [_to_nanos(cost) for cost in estimated_costs]
+        total_nanos = sum(costs_nanos)
+
+        with self._lock:
+            remaining_nanos = self._budget_nanos - self._spent_nanos - self._reserved_nanos
+            exceeded = total_nanos > remaining_nanos
+            if not exceeded:
+                reservation_ids = [str(next(self._ids)) for _ in costs_nanos]
+                self._reserved_nanos += total_nanos
+                self._reservations.update(zip(reservation_ids, costs_nanos))
+
+        if exceeded:
+            raise BudgetExceededError(
+                None,
+                estimated_cost=sum(estimated_costs),
+                remaining=remaining_nanos / _NANOS_PER_USD,
+            )
+        return reservation_ids
 
     def commit(self, reservation_id: str, actual_cost: float) -> None:
         """Commit a reservation and record the actual cost.
@@ -91,14 +207,19 @@ class SpendTracker:
         Raises:
             ValueError: If reservation_id not found
         """
+        cost_nanos = _to_nanos(actual_cost)
         with self._lock:
-            if reservation_id not in self._reservations:
-                raise ValueError(f"Reservation {reservation_id} not found")
-
             # Release the reservation and record actual spend
-            reserved_amount = self._reservations.pop(reservation_id)
-            self._reserved -= reserved_amount
-            self._spent += actual_cost
+            reserved_amount = self._reservations.pop(reservation_id, None)
+            if reserved_amount is not None:
+                self._reserved_nanos -= reserved_amount
+                self._spent_nanos += cost_nanos
+                if cost_nanos < reserved_amount:
+                    # Cheaper than estimated: remaining grew
+                    self._generation += 1
+
+        if reserved_amount is None:
+            raise ValueError(f"Reservation {reservation_id} not found")
 
     def rollback(self, reservation_id: str) -> None:
         """Rollback a reservation after a failed API call.
@@ -113,9 +234,11 @@ class SpendTracker:
             Does not raise an error if reservation not found (idempotent)
         """
         with self._lock:
-            if reservation_id in self._reservations:
-                reserved_amount = self._reservations.pop(reservation_id)
-                self._reserved -= reserved_amount
+            reserved_amount = self._reservations.pop(reservation_id, None)
+            if reserved_amount is not None:
+                self._reserved_nanos -= reserved_amount
+                if reserved_amount:
+                    self._generation += 1
 
     def get_spent(self) -> float:
         """Get the total amount spent so far.
@@ -123,8 +246,8 @@ class SpendTracker:
         Returns:
             Amount spent in USD (not including pending reservations)
         """
-        with self._lock:
-            return self._spent
+        # A single attribute read is atomic, so no lock is needed
+        return self._spent_nanos / _NANOS_PER_USD
 
     def get_remaining(self) -> float:
         """Get the remaining budget available.
@@ -135,7 +258,8 @@ class SpendTracker:
             Remaining budget in USD
         """
         with self._lock:
-            return self._budget - self._spent - self._reserved
+            remaining_nanos = self._budget_nanos - self._spent_nanos - self._reserved_nanos
+        return remaining_nanos / _NANOS_PER_USD
 
     def get_budget(self) -> float:
         """Get the total budget.
@@ -143,8 +267,17 @@ class SpendTracker:
         Returns:
             Total budget in USD
         """
-        with self._lock:
-            return self._budget
+        # Set once in __init__ and never changed
+        return self._budget
+
+    def is_unlimited(self) -> bool:
+        """Check whether the budget is infinite.
+
+        Returns:
+            True if no call can ever exceed the budget
+        """
+        # Set once in __init__ and never changed
+        return self._budget_nanos == float("inf")
 
     def get_reserved(self) -> float:
         """Get the total amount currently reserved.
@@ -152,16 +285,129 @@ class SpendTracker:
         Returns:
             Amount reserved in USD (pending API calls)
         """
+        # A single attribute read is atomic, so no lock is needed
+        return self._reserved_nanos / _NANOS_PER_USD
+
+    def snapshot(self) -> Tuple[float, float, float]:
+        """Get budget, spent and reserved in a single consistent read.
+
+        Returns:
+            Tuple of (budget, spent, reserved) in USD, taken under one lock
+        """
+        with self._lock:
+            spent_nanos, reserved_nanos = self._spent_nanos, self._reserved_nanos
+        return (
+            self._budget, spent_nanos / _NANOS_PER_USD, reserved_nanos / _NANOS_PER_USD
+        )
+
+    def get_utilization_scale(self) -> float:
+        """Get the factor that turns a USD amount into percent of the budget.
+
+        Returns:
+            ``100 / budget``, or 0.0 when the budget is zero or infinite
+        """
+        return self._pct_per_usd
+
+    def get_fired_mask(self) -> int:
+        """Get the bitmask of warning thresholds that have already fired.
+
+        Bit ``i`` stands for the i-th threshold in the session's sorted
+        warning thresholds.
+
+        Returns:
+            Fired-threshold bitmask
+        """
+        return self._fired_mask
+
+    def mark_fired(self, bits: int) -> int:
+        """Atomically mark warning thresholds as fired.
+
+        Args:
+            bits: Bitmask of thresholds that are currently crossed
+
+        Returns:
+            The subset of ``bits`` that had not fired before this call, i.e.
+            the thresholds whose callbacks the caller should now fire
+        """
         with self._lock:
-            return self._reserved
+            newly_fired = bits & ~self._fired_mask
+            self._fired_mask |= bits
+            return newly_fired
 
     def reset(self) -> None:
         """Reset spent and reservations to zero.
 
         WARNING: This does not cancel in-flight API calls. Only use this
         when you're sure no calls are pending.
+
+        Fired warning thresholds are kept, so a warning is still raised at
+        most once per session.
         """
         with self._lock:
-            self._spent = 0.0
-            self._reserved = 0.0
+            self._spent_nanos = 0
+            self._reserved_nanos = 0
             self._reservations.clear()
+            self._generation += 1
+
+
+class UnlimitedSpendTracker(SpendTracker):
+    """Tracker for an infinite budget.
+
+    An unlimited budget can never be exceeded, so reserving skips the
+    budget check and records the reservation at zero cost: reserved is
+    always 0. Reservation IDs keep the SpendTracker contract otherwise:
+    each is unique, commit() raises ValueError for an unknown or already
+    settled ID, and rollback() is idempotent. commit() records the actual
+    cost, so spend reporting stays accurate.
+    """
+
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        """Initialize UnlimitedSpendTracker with an infinite budget."""
+        super().__init__(float("inf"))
+
+    def check_and_reserve(self, estimated_cost: float) -> str:
+        """Reserve an API call without checking or holding any budget.
+
+        Args:
+            estimated_cost: Estimated cost of the API call in USD (unused)
+
+        Returns:
+            Reservation ID to use for commit/rollback
+        """
+        with self._lock:
+            reservation_id = str(next(self._ids))
+            self._reservations[reservation_id] = 0
+        return reservation_id
+
+    def check_and_reserve_many(self, estimated_costs: Sequence[float]) -> List[str]:
+        """Reserve several API calls without checking or holding any budget.
+
+        Args:
+            estimated_costs: Estimated cost of each API call in USD (unused)
+
+        Returns:
+            One reservation ID per cost, in the same order
+        """
+        with self._lock:
+            reservation_ids = [str(next(self._ids)) for _ in estimated_costs]
+            self._reservations.update(dict.fromkeys(reservation_ids, 0))
+        return reservation_ids
+
+
+def create_tracker(budget_usd: float) -> SpendTracker:
+    """Create the tracker best suited to a budget.
+
+    Args:
+        budget_usd: Total budget in USD; ``float("inf")`` for no limit
+
+    Returns:
+        An UnlimitedSpendTracker for an infinite budget, else a SpendTracker
+
+    Raises:
+        ValueError: If budget is negative
+    """
+    if budget_usd == float("inf"):
+        return UnlimitedSpendTracker()
+    return SpendTracker(budget_usd)
@@ -1,12 +1,17 @@
 """Anthropic client wrapper with budget enforcement."""
 
-import threading
-from typing import Any, Callable, List, Optional, Set
+from bisect import bisect_right
+from typing import Any, Callable, Optional, Sequence, Set
 
 from ..exceptions import BudgetExceededError
 from ..providers.anthropic_provider import AnthropicProvider
 from ..tracking.tracker import SpendTracker
 
+# Stream event types that carry usage. String literals are interned, so when
+# the SDK hands back the same object the == below succeeds on identity alone.
+_MESSAGE_START = "message_start"
+_MESSAGE_DELTA = "message_delta"
+
 
 class MessagesCreateWrapper:
     """Wraps client.messages to intercept create() calls."""
@@ -19,63 +24,118 @@ class MessagesCreateWrapper:
         tier: str = "standard",
         on_budget_exceeded: Optional[Callable] = None,
         on_warning: Optional[Callable] = None,
-        warning_thresholds: Optional[List[int]] = None,
+        warning_thresholds: Optional[Sequence[int]] = None,
         fired_thresholds: Optional[Set[int]] = None,
     ) -> None:
         self._original = original_messages
         self._tracker = tracker
         self._provider = provider
+        self._pricing = provider.get_pricing_table()
+        # An infinite budget can never be exceeded, so estimates are pointless
+        self._unlimited = tracker.is_unlimited()
         self._tier = tier
         self._on_budget_exceeded = on_budget_exceeded
         self._on_warning = on_warning
-        self._warning_thresholds = warning_thresholds or []
-        self._fired_thresholds = fired_thresholds if fired_thresholds is not None else set()
-        self._threshold_lock = threading.Lock()
+        self._warning_thresholds = tuple(sorted(set(warning_thresholds or ())))
+        self._warnings_enabled = bool(on_warning) and bool(self._warning_thresholds)
+        self._pct_per_usd = tracker.get_utilization_scale()
+        # Bit i of the tracker's fired mask stands for _warning_thresholds[i]
+        self._all_fired_mask = (1 << len(self._warning_thresholds)) - 1
+        if fired_thresholds:
+            # Back-compat: thresholds the caller already fired become mask bits
+            tracker.mark_fired(sum(
+                1 << i for i, threshold in enumerate(self._warning_thresholds)
+                if threshold in fired_thresholds
+            ))
 
     def _check_warnings(self) -> None:
-        if not self._on_warning or not self._warning_thresholds:
+        """Fire warning callbacks for newly crossed utilization thresholds."""
+        if not self._warnings_enabled:
+            return
+        fired = self._tracker.get_fired_mask()
+        # Every threshold has fired; nothing left to check for this session
+        if fired == self._all_fired_mask:
             return
 
-        budget = self._tracker.get_budget()
+        budget, spent, reserved = self._tracker.snapshot()
         if budget <= 0:
             return
 
-        spent = self._tracker.get_spent()
-        reserved = self._tracker.get_reserved()
-        utilization = (spent + reserved) / budget * 100
-
-        with self._threshold_lock:
-            for threshold in self._warning_thresholds:
-                if utilization >= threshold and threshold not in self._fired_thresholds:
-                    self._fired_thresholds.add(threshold)
-                    self._on_warning({
-                        "threshold": threshold,
-                        "spent": spent,
-                        "remaining": budget - spent - reserved,
-                        "budget": budget,
-                    })
+        utilization = (spent + reserved) * self._pct_per_usd
+        # Thresholds are sorted, so the crossed ones are the low bits. The
+        # tracker marks them atomically and hands back only those that had
+        # not fired yet, so each fires once even across threads and wrappers.
+        crossed = (1 << bisect_right(self._warning_thresholds, utilization)) - 1
+        if not crossed & ~fired:
+            return
+        newly_fired = self._tracker.mark_fired(crossed)
+        if not newly_fired:
+            return
+
+        remaining = budget - spent - reserved
+        for i, threshold in enumerate(self._warning_thresholds):
+            if newly_fired >> i & 1:
+                self._on_warning({
+                    "threshold": threshold,
+                    "spent": spent,
+                    "remaining": remaining,
+                    "budget": budget,
+                })
+
+    def _reserve_or_none(
+        self, model: str, messages: Any, max_tokens: Optional[int]
+    ) -> Optional[str]:
+        """Estimate the call's cost and reserve it against the budget.
+
+        Returns the reservation ID, or None if the budget would be exceeded
+        and on_budget_exceeded handled it. Raises BudgetExceededError otherwise.
+        """
+        if self._unlimited:
+            # Nothing to enforce: skip tokenizing, but still fail fast on a
+            # model that can't be priced
+            self._pricing.get_per_token(model, tier=self._tier)
+            return self._tracker.check_and_reserve(0.0)
+
+        estimated_cost = self._provider.estimate_cost(
+            messages=messages,
+            model=model,
+            max_tokens=max_tokens,
+            tier=self._tier,
+        )
+
+        try:
+            return self._tracker.check_and_reserve(estimated_cost)
+        except BudgetExceededError as e:
+            if self._on_budget_exceeded:
+                self._on_budget_exceeded(e)
+                return None
+            raise
 
     def _anthropic_stream_generator(self, raw_stream: Any, reservation_id: str, model: str):
-        """Transparent generator that commits cost after message_delta event."""
+        """Transparent generator that commits cost once the message_delta usage is seen."""
         input_tokens = 0
+        output_tokens = None
         try:
             for event in raw_stream:
-                yield event
-                if event.type == "message_start":
+                # Read once: most events are content deltas that match neither.
+                # Usage is recorded before the yield so a consumer that stops
+                # right after message_delta is still charged
+                event_type = event.type
+                if event_type == _MESSAGE_START:
                     input_tokens = event.message.usage.input_tokens
-                elif event.type == "message_delta":
+                elif event_type == _MESSAGE_DELTA:
                     output_tokens = event.usage.output_tokens
-                    input_price = self._provider._pricing.get_input_price(model, tier=self._tier)
-                    output_price = self._provider._pricing.get_output_price(model, tier=self._tier)
-                    actual_cost = (
-                        (input_tokens / 1000.0) * input_price
-                        + (output_tokens / 1000.0) * output_price
-                    )
-                    self._tracker.commit(reservation_id, actual_cost)
-                    self._check_warnings()
+                yield event
         finally:
-            # No-op if already committed; rolls back on early exit or exception
-            self._tracker.rollback(reservation_id)
+            if output_tokens is None:
+                # Early exit or exception before usage arrived
+                self._tracker.rollback(reservation_id)
+            else:
+                input_rate, output_rate = self._pricing.get_per_token(model, tier=self._tier)
+                self._tracker.commit(
+                    reservation_id, input_tokens * input_rate + output_tokens * output_rate
+                )
+                self._check_warnings()
 
     def create(self, **kwargs: Any) -> Any:
         """Budget-enforced version of client.messages.create().
@@ -84,23 +144,11 @@ class MessagesCreateWrapper:
         raising BudgetExceededError.
         """
         model = kwargs.get("model", "")
-        messages = kwargs.get("messages", [])
-        max_tokens = kwargs.get("max_tokens")
-
-        estimated_cost = self._provider.estimate_cost(
-            messages=messages,
-            model=model,
-            max_tokens=max_tokens,
-            tier=self._tier,
+        reservation_id = self._reserve_or_none(
+            model, kwargs.get("messages", []), kwargs.get("max_tokens")
         )
-
-        try:
-            reservation_id = self._tracker.check_and_reserve(estimated_cost)
-        except BudgetExceededError as e:
-            if self._on_budget_exceeded:
-                self._on_budget_exceeded(e)
-                return None
-            raise
+        if reservation_id is None:
+            return None
 
         try:
             if kwargs.get("stream"):
@@ -145,7 +193,7 @@ class AnthropicClientWrapper:
         tier: str = "standard",
         on_budget_exceeded: Optional[Callable] = None,
         on_warning: Optional[Callable] = None,
-        warning_thresholds: Optional[List[int]] = None,
+        warning_thresholds: Optional[Sequence[int]] = None,
         fired_thresholds: Optional[Set[int]] = None,
     ) -> None:
         self._client = client
@@ -156,20 +204,24 @@ class AnthropicClientWrapper:
         self._on_warning = on_warning
         self._warning_thresholds = warning_thresholds
         self._fired_thresholds = fired_thresholds
+        self._messages_wrapper: Optional[MessagesCreateWrapper] = None
         self.session = None  # set by BudgetedSession.anthropic()
 
     @property
     def messages(self) -> MessagesCreateWrapper:
-        return MessagesCreateWrapper(
-            self._client.messages,
-            self._tracker,
-            self._provider,
-            self._tier,
-            on_budget_exceeded=self._on_budget_exceeded,
-            on_warning=self._on_warning,
-            warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
-        )
+        # Built once and shared by every thread using this client
+        if self._messages_wrapper is None:
+            self._messages_wrapper = MessagesCreateWrapper(
+                self._client.messages,
+                self._tracker,
+                self._provider,
+                self._tier,
+                on_budget_exceeded=self._on_budget_exceeded,
+                on_warning=self._on_warning,
+                warning_thresholds=self._warning_thresholds,
+                fired_thresholds=self._fired_thresholds,
+            )
+        return self._messages_wrapper
 
     def __getattr__(self, name: str) -> Any:
         """Forward attribute access to the underlying Anthropic client."""
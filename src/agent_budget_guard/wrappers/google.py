@@ -1,7 +1,7 @@
 """Google Gemini client wrapper with budget enforcement."""
 
-import threading
-from typing import Any, Callable, List, Optional, Set
+from bisect import bisect_right
+from typing import Any, Callable, Optional, Sequence, Set
 
 from ..exceptions import BudgetExceededError
 from ..providers.google_provider import GoogleProvider
@@ -19,61 +19,82 @@ class ModelsWrapper:
         tier: str = "standard",
         on_budget_exceeded: Optional[Callable] = None,
         on_warning: Optional[Callable] = None,
-        warning_thresholds: Optional[List[int]] = None,
+        warning_thresholds: Optional[Sequence[int]] = None,
         fired_thresholds: Optional[Set[int]] = None,
     ) -> None:
         self._original = original_models
         self._tracker = tracker
         self._provider = provider
+        self._calculate_cost = provider.calculate_cost
+        self._pricing = provider.get_pricing_table()
+        # An infinite budget can never be exceeded, so estimates are pointless
+        self._unlimited = tracker.is_unlimited()
         self._tier = tier
         self._on_budget_exceeded = on_budget_exceeded
         self._on_warning = on_warning
-        self._warning_thresholds = warning_thresholds or []
-        self._fired_thresholds = fired_thresholds if fired_thresholds is not None else set()
-        self._threshold_lock = threading.Lock()
+        self._warning_thresholds = tuple(sorted(set(warning_thresholds or ())))
+        self._warnings_enabled = bool(on_warning) and bool(self._warning_thresholds)
+        self._pct_per_usd = tracker.get_utilization_scale()
+        # Bit i of the tracker's fired mask stands for _warning_thresholds[i]
+        self._all_fired_mask = (1 << len(self._warning_thresholds)) - 1
+        if fired_thresholds:
+            # Back-compat: thresholds the caller already fired become mask bits
+            tracker.mark_fired(sum(
+                1 << i for i, threshold in enumerate(self._warning_thresholds)
+                if threshold in fired_thresholds
+            ))
 
     def _check_warnings(self) -> None:
-        if not self._on_warning or not self._warning_thresholds:
+        """Fire warning callbacks for newly crossed utilization thresholds."""
+        if not self._warnings_enabled:
+            return
+        fired = self._tracker.get_fired_mask()
+        # Every threshold has fired; nothing left to check for this session
+        if fired == self._all_fired_mask:
             return
 
-        budget = self._tracker.get_budget()
+        budget, spent, reserved = self._tracker.snapshot()
         if budget <= 0:
             return
 
-        spent = self._tracker.get_spent()
-        reserved = self._tracker.get_reserved()
-        utilization = (spent + reserved) / budget * 100
-
-        with self._threshold_lock:
-            for threshold in self._warning_thresholds:
-                if utilization >= threshold and threshold not in self._fired_thresholds:
-                    self._fired_thresholds.add(threshold)
-                    self._on_warning({
-                        "threshold": threshold,
-                        "spent": spent,
-                        "remaining": budget - spent - reserved,
-                        "budget": budget,
-                    })
-
-    def generate_content(self, model: str, contents: Any, **kwargs: Any) -> Any:
-        """Budget-enforced version of client.models.generate_content().
-
-        Args:
-            model: Gemini model name (e.g. "gemini-2.0-flash")
-            contents: Prompt content — string, list of strings, or list of
-                      Content dicts with "parts" key.
-            **kwargs: Extra args forwarded to the underlying SDK call
-                      (e.g. config=GenerateContentConfig(...)).
+        utilization = (spent + reserved) * self._pct_per_usd
+        # Thresholds are sorted, so the crossed ones are the low bits. The
+        # tracker marks them atomically and hands back only those that had
+        # not fired yet, so each fires once even across threads and wrappers.
+        crossed = (1 << bisect_right(self._warning_thresholds, utilization)) - 1
+        if not crossed & ~fired:
+            return
+        newly_fired = self._tracker.mark_fired(crossed)
+        if not newly_fired:
+            return
 
-        If on_budget_exceeded callback is set, returns None instead of
-        raising BudgetExceededError.
+        remaining = budget - spent - reserved
+        for i, threshold in enumerate(self._warning_thresholds):
+            if newly_fired >> i & 1:
+                self._on_warning({
+                    "threshold": threshold,
+                    "spent": spent,
+                    "remaining": remaining,
+                    "budget": budget,
+                })
+
+    def _reserve_or_none(self, model: str, contents: Any, config: Any) -> Optional[str]:
+        """Estimate the call's cost and reserve it against the budget.
+
+        Returns the reservation ID, or None if the budget would be exceeded
+        and on_budget_exceeded handled it. Raises BudgetExceededError otherwise.
         """
+        if self._unlimited:
+            # Nothing to enforce: skip tokenizing, but still fail fast on a
+            # model that can't be priced
+            self._pricing.get_per_token(model, tier=self._tier)
+            return self._tracker.check_and_reserve(0.0)
+
         # Normalise contents into something the provider can count tokens for
         messages = contents if contents is not None else []
 
         # Extract max_output_tokens from config kwarg if present
         max_tokens: Optional[int] = None
-        config = kwargs.get("config")
         if config is not None:
             if isinstance(config, dict):
                 max_tokens = config.get("max_output_tokens")
@@ -88,19 +109,36 @@ class ModelsWrapper:
         )
 
         try:
-            reservation_id = self._tracker.check_and_reserve(estimated_cost)
+            return self._tracker.check_and_reserve(estimated_cost)
         except BudgetExceededError as e:
             if self._on_budget_exceeded:
                 self._on_budget_exceeded(e)
                 return None
             raise
 
+    def generate_content(self, model: str, contents: Any, **kwargs: Any) -> Any:
+        """Budget-enforced version of client.models.generate_content().
+
+        Args:
+            model: Gemini model name (e.g. "gemini-2.0-flash")
+            contents: Prompt content — string, list of strings, or list of
+                      Content dicts with "parts" key.
+            **kwargs: Extra args forwarded to the underlying SDK call
+                      (e.g. config=GenerateContentConfig(...)).
+
+        If on_budget_exceeded callback is set, returns None instead of
+        raising BudgetExceededError.
+        """
+        reservation_id = self._reserve_or_none(model, contents, kwargs.get("config"))
+        if reservation_id is None:
+            return None
+
         try:
             response = self._original.generate_content(
                 model=model, contents=contents, **kwargs
             )
 
-            actual_cost = self._provider.calculate_cost(
+            actual_cost = self._calculate_cost(
                 response, tier=self._tier, model=model
             )
             self._tracker.commit(reservation_id, actual_cost)
@@ -112,22 +150,27 @@ class ModelsWrapper:
             raise
 
     def _google_stream_generator(self, raw_stream: Any, reservation_id: str, model: str):
-        """Transparent generator that commits cost from the last chunk's usage_metadata."""
+        """Transparent generator that commits cost from the last chunk's usage_metadata.
+
+        Every Gemini chunk carries usage_metadata, so only a fully consumed
+        stream tells which chunk is last. A consumer that stops early has
+        its reservation rolled back.
+        """
         last_chunk = None
+        exhausted = False
         try:
             for chunk in raw_stream:
-                yield chunk
                 last_chunk = chunk
-            # Stream completed normally — commit from last chunk
-            if last_chunk is not None:
-                actual_cost = self._provider.calculate_cost(
-                    last_chunk, tier=self._tier, model=model
-                )
+                yield chunk
+            exhausted = True
+        finally:
+            if exhausted and last_chunk is not None:
+                actual_cost = self._calculate_cost(last_chunk, tier=self._tier, model=model)
                 self._tracker.commit(reservation_id, actual_cost)
                 self._check_warnings()
-        finally:
-            # No-op if already committed; rolls back on early exit or exception
-            self._tracker.rollback(reservation_id)
+            else:
+                # Early exit, exception, or an empty stream
+                self._tracker.rollback(reservation_id)
 
     def generate_content_stream(self, model: str, contents: Any, **kwargs: Any) -> Any:
         """Budget-enforced streaming version of client.models.generate_content_stream().
@@ -141,30 +184,9 @@ class ModelsWrapper:
         If on_budget_exceeded callback is set, returns None instead of
         raising BudgetExceededError.
         """
-        messages = contents if contents is not None else []
-
-        max_tokens: Optional[int] = None
-        config = kwargs.get("config")
-        if config is not None:
-            if isinstance(config, dict):
-                max_tokens = config.get("max_output_tokens")
-            else:
-                max_tokens = getattr(config, "max_output_tokens", None)
-
-        estimated_cost = self._provider.estimate_cost(
-            messages=messages,
-            model=model,
-            max_tokens=max_tokens,
-            tier=self._tier,
-        )
-
-        try:
-            reservation_id = self._tracker.check_and_reserve(estimated_cost)
-        except BudgetExceededError as e:
-            if self._on_budget_exceeded:
-                self._on_budget_exceeded(e)
-                return None
-            raise
+        reservation_id = self._reserve_or_none(model, contents, kwargs.get("config"))
+        if reservation_id is None:
+            return None
 
         try:
             raw_stream = self._original.generate_content_stream(
@@ -206,7 +228,7 @@ class GoogleClientWrapper:
         tier: str = "standard",
         on_budget_exceeded: Optional[Callable] = None,
         on_warning: Optional[Callable] = None,
-        warning_thresholds: Optional[List[int]] = None,
+        warning_thresholds: Optional[Sequence[int]] = None,
         fired_thresholds: Optional[Set[int]] = None,
     ) -> None:
         self._client = client
@@ -217,20 +239,24 @@ class GoogleClientWrapper:
         self._on_warning = on_warning
         self._warning_thresholds = warning_thresholds
         self._fired_thresholds = fired_thresholds
+        self._models_wrapper: Optional[ModelsWrapper] = None
         self.session = None  # set by BudgetedSession.google()
 
     @property
     def models(self) -> ModelsWrapper:
-        return ModelsWrapper(
-            self._client.models,
-            self._tracker,
-            self._provider,
-            self._tier,
-            on_budget_exceeded=self._on_budget_exceeded,
-            on_warning=self._on_warning,
-            warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
-        )
+        # Built once and shared by every thread using this client
+        if self._models_wrapper is None:
+            self._models_wrapper = ModelsWrapper(
+                self._client.models,
+                self._tracker,
+                self._provider,
+                self._tier,
+                on_budget_exceeded=self._on_budget_exceeded,
+                on_warning=self._on_warning,
+                warning_thresholds=self._warning_thresholds,
+                fired_thresholds=self._fired_thresholds,
+            )
+        return self._models_wrapper
 
     def __getattr__(self, name: str) -> Any:
         """Forward attribute access to the underlying Google client."""
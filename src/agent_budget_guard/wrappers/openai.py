@@ -1,6 +1,6 @@
 """OpenAI client wrappers with budget enforcement."""
 
-import threading
+from bisect import bisect_right
 from typing import Any, Callable, List, Optional, Set
 
 from ..cost.estimator import CostEstimator
@@ -28,54 +28,80 @@ class CompletionsWrapper:
         self._tracker = tracker
         self._estimator = estimator
         self._calculator = calculator
+        self._pricing = estimator.get_pricing_table()
+        # An infinite budget can never be exceeded, so estimates are pointless
+        self._unlimited = tracker.is_unlimited()
         self._tier = tier
         self._on_budget_exceeded = on_budget_exceeded
         self._on_warning = on_warning
-        self._warning_thresholds = warning_thresholds or []
-        self._fired_thresholds = fired_thresholds if fired_thresholds is not None else set()
-        self._threshold_lock = threading.Lock()
+        self._warning_thresholds = tuple(sorted(set(warning_thresholds or ())))
+        self._warnings_enabled = bool(on_warning) and bool(self._warning_thresholds)
+        self._pct_per_usd = tracker.get_utilization_scale()
+        # Bit i of the tracker's fired mask stands for _warning_thresholds[i]
+        self._all_fired_mask = (1 << len(self._warning_thresholds)) - 1
+        if fired_thresholds:
+            # Back-compat: thresholds the caller already fired become mask bits
+            tracker.mark_fired(sum(
+                1 << i for i, threshold in enumerate(self._warning_thresholds)
+                if threshold in fired_thresholds
+            ))
 
     def _check_warnings(self) -> None:
         """Fire warning callbacks for newly crossed utilization thresholds."""
-        if not self._on_warning or not self._warning_thresholds:
+        if not self._warnings_enabled:
+            return
+        fired = self._tracker.get_fired_mask()
+        # Every threshold has fired; nothing left to check for this session
+        if fired == self._all_fired_mask:
             return
 
-        budget = self._tracker.get_budget()
+        budget, spent, reserved = self._tracker.snapshot()
         if budget <= 0:
             return
 
-        spent = self._tracker.get_spent()
-        reserved = self._tracker.get_reserved()
-        utilization = (spent + reserved) / budget * 100
-
-        with self._threshold_lock:
-            for threshold in self._warning_thresholds:
-                if utilization >= threshold and threshold not in self._fired_thresholds:
-                    self._fired_thresholds.add(threshold)
-                    self._on_warning({
-                        "threshold": threshold,
-                        "spent": spent,
-                        "remaining": budget - spent - reserved,
-                        "budget": budget,
-                    })
+        utilization = (spent + reserved) * self._pct_per_usd
+        # Thresholds are sorted, so the crossed ones are the low bits. The
+        # tracker marks them atomically and hands back only those that had
+        # not fired yet, so each fires once even across threads and wrappers.
+        crossed = (1 << bisect_right(self._warning_thresholds, utilization)) - 1
+        if not crossed & ~fired:
+            return
+        newly_fired = self._tracker.mark_fired(crossed)
+        if not newly_fired:
+            return
+
+        remaining = budget - spent - reserved
+        for i, threshold in enumerate(self._warning_thresholds):
+            if newly_fired >> i & 1:
+                self._on_warning({
+                    "threshold": threshold,
+                    "spent": spent,
+                    "remaining": remaining,
+                    "budget": budget,
+                })
 
     def _openai_stream_generator(self, raw_stream: Any, reservation_id: str, model: str):
         """Transparent generator that defers cost commit until usage data arrives."""
+        usage = None
         try:
             for chunk in raw_stream:
+                # Only the first usage-bearing chunk counts. It is recorded
+                # before the yield so a consumer that stops right after it is
+                # still charged
+                if usage is None:
+                    usage = chunk.usage
                 yield chunk
-                if chunk.usage is not None:
-                    input_price = self._estimator._pricing.get_input_price(model, self._tier)
-                    output_price = self._estimator._pricing.get_output_price(model, self._tier)
-                    actual_cost = (
-                        (chunk.usage.prompt_tokens / 1000) * input_price
-                        + (chunk.usage.completion_tokens / 1000) * output_price
-                    )
-                    self._tracker.commit(reservation_id, actual_cost)
-                    self._check_warnings()
         finally:
-            # No-op if already committed; rolls back on early exit or exception
-            self._tracker.rollback(reservation_id)
+            if usage is None:
+                # Early exit or exception before usage arrived
+                self._tracker.rollback(reservation_id)
+            else:
+                input_rate, output_rate = self._pricing.get_per_token(model, self._tier)
+                actual_cost = (
+                    usage.prompt_tokens * input_rate + usage.completion_tokens * output_rate
+                )
+                self._tracker.commit(reservation_id, actual_cost)
+                self._check_warnings()
 
     def create(self, **kwargs: Any) -> Any:
         """Budget-enforced version of chat.completions.create().
@@ -88,12 +114,18 @@ class CompletionsWrapper:
         max_tokens = kwargs.get("max_tokens")
 
         # STEP 1: Estimate cost before call
-        estimated_cost = self._estimator.estimate_chat_completion_cost(
-            model=model,
-            messages=messages,
-            max_tokens=max_tokens,
-            tier=self._tier
-        )
+        if self._unlimited:
+            # Nothing to enforce: skip tokenizing, but still fail fast on a
+            # model that can't be priced
+            self._pricing.get_per_token(model, tier=self._tier)
+            estimated_cost = 0.0
+        else:
+            estimated_cost = self._estimator.estimate_chat_completion_cost(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                tier=self._tier
+            )
 
         # STEP 2: Atomic budget check + reserve
         try:
@@ -107,9 +139,14 @@ class CompletionsWrapper:
         try:
             # STEP 3: Make actual API call
             if kwargs.get("stream"):
-                # Auto-inject stream_options so usage appears in the final chunk
-                kwargs.setdefault("stream_options", {})
-                kwargs["stream_options"]["include_usage"] = True
+                # Auto-inject stream_options so usage appears in the final chunk.
+                # A caller dict that already asks for usage is passed through
+                # as-is; otherwise it is copied, never mutated.
+                stream_options = kwargs.get("stream_options")
+                if not stream_options:
+                    kwargs["stream_options"] = {"include_usage": True}
+                elif stream_options.get("include_usage") is not True:
+                    kwargs["stream_options"] = {**stream_options, "include_usage": True}
                 raw_stream = self._original.create(**kwargs)
                 return self._openai_stream_generator(raw_stream, reservation_id, model)
 
@@ -158,20 +195,24 @@ class ChatWrapper:
         self._on_warning = on_warning
         self._warning_thresholds = warning_thresholds
         self._fired_thresholds = fired_thresholds
+        self._completions_wrapper: Optional[CompletionsWrapper] = None
 
     @property
     def completions(self) -> CompletionsWrapper:
-        return CompletionsWrapper(
-            self._original.completions,
-            self._tracker,
-            self._estimator,
-            self._calculator,
-            self._tier,
-            on_budget_exceeded=self._on_budget_exceeded,
-            on_warning=self._on_warning,
-            warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
-        )
+        # Built once and shared by every thread using this client
+        if self._completions_wrapper is None:
+            self._completions_wrapper = CompletionsWrapper(
+                self._original.completions,
+                self._tracker,
+                self._estimator,
+                self._calculator,
+                self._tier,
+                on_budget_exceeded=self._on_budget_exceeded,
+                on_warning=self._on_warning,
+                warning_thresholds=self._warning_thresholds,
+                fired_thresholds=self._fired_thresholds,
+            )
+        return self._completions_wrapper
 
 
 class OpenAIClientWrapper:
@@ -209,21 +250,25 @@ class OpenAIClientWrapper:
         self._on_warning = on_warning
         self._warning_thresholds = warning_thresholds
         self._fired_thresholds = fired_thresholds
+        self._chat_wrapper: Optional[ChatWrapper] = None
         self.session = None  # set by BudgetedSession.openai()
 
     @property
     def chat(self) -> ChatWrapper:
-        return ChatWrapper(
-            self._client.chat,
-            self._tracker,
-            self._estimator,
-            self._calculator,
-            self._tier,
-            on_budget_exceeded=self._on_budget_exceeded,
-            on_warning=self._on_warning,
-            warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
-        )
+        # Built once and shared by every thread using this client
+        if self._chat_wrapper is None:
+            self._chat_wrapper = ChatWrapper(
+                self._client.chat,
+                self._tracker,
+                self._estimator,
+                self._calculator,
+                self._tier,
+                on_budget_exceeded=self._on_budget_exceeded,
+                on_warning=self._on_warning,
+                warning_thresholds=self._warning_thresholds,
+                fired_thresholds=self._fired_thresholds,
+            )
+        return self._chat_wrapper
 
     def __getattr__(self, name: str) -> Any:
         """Forward attribute access to underlying client."""
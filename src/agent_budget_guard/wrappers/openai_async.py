@@ -1,7 +1,7 @@
 """Async OpenAI client wrapper with budget enforcement."""
 
-import threading
-from typing import Any, Callable, List, Optional, Set
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Optional, Sequence, Set
 
 from ..cost.estimator import CostEstimator
 from ..cost.calculator import CostCalculator
@@ -12,6 +12,13 @@ from ..tracking.tracker import SpendTracker
 class AsyncCompletionsWrapper:
     """Wraps async chat.completions to intercept create() calls."""
 
+    __slots__ = (
+        "_original", "_tracker", "_estimator", "_calculator", "_pricing", "_tier",
+        "_on_budget_exceeded", "_on_warning", "_warning_thresholds",
+        "_warnings_enabled", "_pct_per_usd", "_all_fired_mask", "_reserve", "_commit", "_rollback",
+        "_unlimited",
+    )
+
     def __init__(
         self,
         original_completions: Any,
@@ -21,99 +28,171 @@ class AsyncCompletionsWrapper:
         tier: str = "standard",
         on_budget_exceeded: Optional[Callable] = None,
         on_warning: Optional[Callable] = None,
-        warning_thresholds: Optional[List[int]] = None,
+        warning_thresholds: Optional[Sequence[int]] = None,
         fired_thresholds: Optional[Set[int]] = None,
     ) -> None:
         self._original = original_completions
         self._tracker = tracker
+        # Bound once so the per-call path skips the tracker attribute lookups
+        self._reserve = tracker.check_and_reserve
+        self._commit = tracker.commit
+        self._rollback = tracker.rollback
         self._estimator = estimator
         self._calculator = calculator
+        self._pricing = estimator.get_pricing_table()
+        # An infinite budget can never be exceeded, so estimates are pointless
+        self._unlimited = tracker.is_unlimited()
         self._tier = tier
         self._on_budget_exceeded = on_budget_exceeded
         self._on_warning = on_warning
-        self._warning_thresholds = warning_thresholds or []
-        self._fired_thresholds = fired_thresholds if fired_thresholds is not None else set()
-        self._threshold_lock = threading.Lock()
+        self._warning_thresholds = tuple(sorted(set(warning_thresholds or ())))
+        self._warnings_enabled = bool(on_warning) and bool(self._warning_thresholds)
+        self._pct_per_usd = tracker.get_utilization_scale()
+        # Bit i of the tracker's fired mask stands for _warning_thresholds[i]
+        self._all_fired_mask = (1 << len(self._warning_thresholds)) - 1
+        if fired_thresholds:
+            # Back-compat: thresholds the caller already fired become mask bits
+            tracker.mark_fired(sum(
+                1 << i for i, threshold in enumerate(self._warning_thresholds)
+                if threshold in fired_thresholds
+            ))
 
     def _check_warnings(self) -> None:
-        if not self._on_warning or not self._warning_thresholds:
+        """Fire warning callbacks for newly crossed utilization thresholds."""
+        if not self._warnings_enabled:
+            return
+        fired = self._tracker.get_fired_mask()
+        # Every threshold has fired; nothing left to check for this session
+        if fired == self._all_fired_mask:
             return
-        budget = self._tracker.get_budget()
+
+        budget, spent, reserved = self._tracker.snapshot()
         if budget <= 0:
             return
-        spent = self._tracker.get_spent()
-        reserved = self._tracker.get_reserved()
-        utilization = (spent + reserved) / budget * 100
-        with self._threshold_lock:
-            for threshold in self._warning_thresholds:
-                if utilization >= threshold and threshold not in self._fired_thresholds:
-                    self._fired_thresholds.add(threshold)
-                    self._on_warning({
-                        "threshold": threshold,
-                        "spent": spent,
-                        "remaining": budget - spent - reserved,
-                        "budget": budget,
-                    })
+
+        utilization = (spent + reserved) * self._pct_per_usd
+        # Thresholds are sorted, so the crossed ones are the low bits. The
+        # tracker marks them atomically and hands back only those that had
+        # not fired yet, so each fires once even across threads and wrappers.
+        crossed = (1 << bisect_right(self._warning_thresholds, utilization)) - 1
+        if not crossed & ~fired:
+            return
+        newly_fired = self._tracker.mark_fired(crossed)
+        if not newly_fired:
+            return
+
+        remaining = budget - spent - reserved
+        for i, threshold in enumerate(self._warning_thresholds):
+            if newly_fired >> i & 1:
+                self._on_warning({
+                    "threshold": threshold,
+                    "spent": spent,
+                    "remaining": remaining,
+                    "budget": budget,
+                })
 
     async def _stream_generator(self, raw_stream: Any, reservation_id: str, model: str):
         """Async generator that commits cost from the final chunk containing usage."""
+        usage = None
+        exhausted = False
         try:
             async for chunk in raw_stream:
+                # Only the first usage-bearing chunk counts. It is recorded
+                # before the yield so a consumer that stops right after it is
+                # still charged
+                if usage is None:
+                    usage = chunk.usage
                 yield chunk
-                if chunk.usage is not None:
-                    input_price = self._estimator._pricing.get_input_price(model, self._tier)
-                    output_price = self._estimator._pricing.get_output_price(model, self._tier)
-                    actual_cost = (
-                        (chunk.usage.prompt_tokens / 1000) * input_price
-                        + (chunk.usage.completion_tokens / 1000) * output_price
-                    )
-                    self._tracker.commit(reservation_id, actual_cost)
-                    self._check_warnings()
+            exhausted = True
         finally:
-            self._tracker.rollback(reservation_id)
+            if usage is None:
+                # Early exit or exception before usage arrived
+                self._rollback(reservation_id)
+            else:
+                in_rate, out_rate = self._pricing.get_per_token(model, self._tier)
+                self._commit(
+                    reservation_id,
+                    usage.prompt_tokens * in_rate + usage.completion_tokens * out_rate,
+                )
+                self._check_warnings()
+            if not exhausted:
+                # Release the upstream connection now rather than at GC time
+                aclose = getattr(raw_stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
 
     async def create(self, **kwargs: Any) -> Any:
         """Budget-enforced async version of chat.completions.create()."""
         model = kwargs.get("model")
-        messages = kwargs.get("messages", [])
-        max_tokens = kwargs.get("max_tokens")
 
-        estimated_cost = self._estimator.estimate_chat_completion_cost(
-            model=model,
-            messages=messages,
-            max_tokens=max_tokens,
-            tier=self._tier,
-        )
+        if self._unlimited:
+            # Nothing to enforce: skip tokenizing, but still fail fast on a
+            # model that can't be priced
+            self._pricing.get_per_token(model, tier=self._tier)
+            estimated_cost = 0.0
+        else:
+            estimated_cost = self._estimator.estimate_chat_completion_cost(
+                model=model,
+                messages=kwargs.get("messages", []),
+                max_tokens=kwargs.get("max_tokens"),
+                tier=self._tier,
+            )
 
         try:
-            reservation_id = self._tracker.check_and_reserve(estimated_cost)
+            reservation_id = self._reserve(estimated_cost)
         except BudgetExceededError as e:
             if self._on_budget_exceeded:
                 self._on_budget_exceeded(e)
                 return None
             raise
 
-        try:
-            if kwargs.get("stream"):
-                kwargs.setdefault("stream_options", {})
-                kwargs["stream_options"]["include_usage"] = True
-                raw_stream = await self._original.create(**kwargs)
-                return self._stream_generator(raw_stream, reservation_id, model)
+        if kwargs.get("stream"):
+            return await self._create_streaming(reservation_id, model, kwargs)
+        return await self._create_nonstreaming(reservation_id, kwargs)
 
+    async def _create_nonstreaming(self, reservation_id: str, kwargs: Dict[str, Any]) -> Any:
+        """Make a non-streaming call and commit its actual cost."""
+        try:
             response = await self._original.create(**kwargs)
             actual_cost = self._calculator.calculate_from_response(response, tier=self._tier)
-            self._tracker.commit(reservation_id, actual_cost)
+            self._commit(reservation_id, actual_cost)
             self._check_warnings()
             return response
+        except BaseException:
+            # BaseException so a task cancelled while awaiting the upstream
+            # call still releases its reservation
+            self._rollback(reservation_id)
+            raise
 
-        except Exception:
-            self._tracker.rollback(reservation_id)
+    async def _create_streaming(
+        self, reservation_id: str, model: str, kwargs: Dict[str, Any]
+    ) -> Any:
+        """Start a streaming call and wrap it so cost is committed on completion."""
+        # kwargs is create()'s own dict, but stream_options belongs to the
+        # caller: pass it through when it already asks for usage, otherwise
+        # copy rather than mutate it
+        stream_options = kwargs.get("stream_options")
+        if not stream_options:
+            kwargs["stream_options"] = {"include_usage": True}
+        elif stream_options.get("include_usage") is not True:
+            kwargs["stream_options"] = {**stream_options, "include_usage": True}
+        try:
+            raw_stream = await self._original.create(**kwargs)
+        except BaseException:
+            self._rollback(reservation_id)
             raise
+        return self._stream_generator(raw_stream, reservation_id, model)
 
 
 class AsyncChatWrapper:
     """Wraps async client.chat namespace."""
 
+    __slots__ = (
+        "_original", "_tracker", "_estimator", "_calculator", "_tier",
+        "_on_budget_exceeded", "_on_warning", "_warning_thresholds", "_fired_thresholds",
+        "_completions_wrapper",
+    )
+
     def __init__(
         self,
         original_chat: Any,
@@ -123,7 +202,7 @@ class AsyncChatWrapper:
         tier: str = "standard",
         on_budget_exceeded: Optional[Callable] = None,
         on_warning: Optional[Callable] = None,
-        warning_thresholds: Optional[List[int]] = None,
+        warning_thresholds: Optional[Sequence[int]] = None,
         fired_thresholds: Optional[Set[int]] = None,
     ) -> None:
         self._original = original_chat
@@ -135,20 +214,24 @@ class AsyncChatWrapper:
         self._on_warning = on_warning
         self._warning_thresholds = warning_thresholds
         self._fired_thresholds = fired_thresholds
+        self._completions_wrapper: Optional[AsyncCompletionsWrapper] = None
 
     @property
     def completions(self) -> AsyncCompletionsWrapper:
-        return AsyncCompletionsWrapper(
-            self._original.completions,
-            self._tracker,
-            self._estimator,
-            self._calculator,
-            self._tier,
-            on_budget_exceeded=self._on_budget_exceeded,
-            on_warning=self._on_warning,
-            warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
-        )
+        # Built once and shared by every task using this client
+        if self._completions_wrapper is None:
+            self._completions_wrapper = AsyncCompletionsWrapper(
+                self._original.completions,
+                self._tracker,
+                self._estimator,
+                self._calculator,
+                self._tier,
+                on_budget_exceeded=self._on_budget_exceeded,
+                on_warning=self._on_warning,
+                warning_thresholds=self._warning_thresholds,
+                fired_thresholds=self._fired_thresholds,
+            )
+        return self._completions_wrapper
 
 
 class AsyncOpenAIClientWrapper:
@@ -172,6 +255,12 @@ class AsyncOpenAIClientWrapper:
         ...     print(chunk.choices[0].delta.content or "", end="")
     """
 
+    __slots__ = (
+        "_client", "_tracker", "_estimator", "_calculator", "_tier",
+        "_on_budget_exceeded", "_on_warning", "_warning_thresholds", "_fired_thresholds",
+        "_chat_wrapper", "session",
+    )
+
     def __init__(
         self,
         client: Any,
@@ -181,7 +270,7 @@ class AsyncOpenAIClientWrapper:
         tier: str = "standard",
         on_budget_exceeded: Optional[Callable] = None,
         on_warning: Optional[Callable] = None,
-        warning_thresholds: Optional[List[int]] = None,
+        warning_thresholds: Optional[Sequence[int]] = None,
         fired_thresholds: Optional[Set[int]] = None,
     ) -> None:
         self._client = client
@@ -193,21 +282,49 @@ class AsyncOpenAIClientWrapper:
         self._on_warning = on_warning
         self._warning_thresholds = warning_thresholds
         self._fired_thresholds = fired_thresholds
+        self._chat_wrapper: Optional[AsyncChatWrapper] = None
         self.session = None  # set by BudgetedSession.async_openai()
 
     @property
     def chat(self) -> AsyncChatWrapper:
-        return AsyncChatWrapper(
-            self._client.chat,
-            self._tracker,
-            self._estimator,
-            self._calculator,
-            self._tier,
-            on_budget_exceeded=self._on_budget_exceeded,
-            on_warning=self._on_warning,
-            warning_thresholds=self._warning_thresholds,
-            fired_thresholds=self._fired_thresholds,
-        )
+        # Built once and shared by every task using this client
+        if self._chat_wrapper is None:
+            self._chat_wrapper = AsyncChatWrapper(
+                self._client.chat,
+                self._tracker,
+                self._estimator,
+                self._calculator,
+                self._tier,
+                on_budget_exceeded=self._on_budget_exceeded,
+                on_warning=self._on_warning,
+                warning_thresholds=self._warning_thresholds,
+                fired_thresholds=self._fired_thresholds,
+            )
+        return self._chat_wrapper
+
+    # Common client namespaces are forwarded explicitly so they don't pay for
+    # the failed normal lookup that precedes __getattr__. They are passed
+    # through unchanged (no budget enforcement).
+
+    @property
+    def models(self) -> Any:
+        return self._client.models
+
+    @property
+    def embeddings(self) -> Any:
+        return self._client.embeddings
+
+    @property
+    def files(self) -> Any:
+        return self._client.files
+
+    @property
+    def fine_tuning(self) -> Any:
+        return self._client.fine_tuning
+
+    @property
+    def beta(self) -> Any:
+        return self._client.beta
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._client, name)
@@ -1 +1,35 @@
 """Pytest configuration and shared fixtures."""
+
+import sys
+import types
+
+import pytest
+
+from agent_budget_guard.cost.pricing import PricingTable
+
+
+@pytest.fixture(scope="session")
+def pricing():
+    """OpenAI pricing table, loaded once. Read-only in tests."""
+    return PricingTable()
+
+
+@pytest.fixture(scope="module")
+def fake_sdks():
+    """Install empty stand-in SDK modules for the duration of a test module.
+
+    Factory tests set the client class they need on the stub, e.g.
+    ``fake_sdks["openai"].AsyncOpenAI = Mock(...)``. The real modules (if any)
+    are restored afterwards.
+    """
+    names = ("openai", "anthropic", "google", "google.genai")
+    saved = {name: sys.modules.get(name) for name in names}
+    stubs = {name: types.ModuleType(name) for name in names}
+    stubs["google"].genai = stubs["google.genai"]
+    sys.modules.update(stubs)
+    yield stubs
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
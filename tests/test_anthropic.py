@@ -1,6 +1,7 @@
 """Tests for Anthropic provider and wrapper."""
 
 import sys
+from dataclasses import dataclass
 from unittest.mock import Mock, patch
 
 import pytest
@@ -8,9 +9,22 @@ import pytest
 from agent_budget_guard import BudgetedSession, BudgetExceededError
 from agent_budget_guard.cost.pricing import PricingTable
 from agent_budget_guard.providers.anthropic_provider import AnthropicProvider
+from agent_budget_guard.tracking.tracker import SpendTracker
 from agent_budget_guard.wrappers.anthropic import AnthropicClientWrapper
 
 
+@dataclass(frozen=True)
+class _AnthroUsage:
+    input_tokens: int
+    output_tokens: int
+
+
+@dataclass(frozen=True)
+class _AnthroResp:
+    usage: _AnthroUsage
+    model: str = "claude-haiku-4-5"
+
+
 # ---------------------------------------------------------------------------
 # AnthropicProvider unit tests
 # ---------------------------------------------------------------------------
@@ -63,15 +77,11 @@ class TestAnthropicProvider:
         assert cost > 0
 
     def test_calculate_cost_uses_response_usage(self):
-        mock_response = Mock()
-        mock_response.model = "claude-haiku-4-5"
-        mock_response.usage = Mock()
-        mock_response.usage.input_tokens = 100
-        mock_response.usage.output_tokens = 50
+        mock_response = _AnthroResp(_AnthroUsage(100, 50))
 
         cost = self.provider.calculate_cost(mock_response)
 
-        pricing = PricingTable(provider="anthropic")
+        pricing = self.provider.get_pricing_table()
         expected = (
             (100 / 1000) * pricing.get_input_price("claude-haiku-4-5")
             + (50 / 1000) * pricing.get_output_price("claude-haiku-4-5")
@@ -80,11 +90,7 @@ class TestAnthropicProvider:
 
     def test_calculate_cost_model_override(self):
         """model kwarg takes precedence over response.model."""
-        mock_response = Mock()
-        mock_response.model = "claude-haiku-4-5"
-        mock_response.usage = Mock()
-        mock_response.usage.input_tokens = 100
-        mock_response.usage.output_tokens = 50
+        mock_response = _AnthroResp(_AnthroUsage(100, 50))
 
         cost_haiku = self.provider.calculate_cost(mock_response, model="claude-haiku-4-5")
         cost_opus = self.provider.calculate_cost(mock_response, model="claude-opus-4-6")
@@ -96,7 +102,7 @@ class TestAnthropicProvider:
         assert isinstance(pricing, PricingTable)
         # Spot-check a known Claude model
         price = pricing.get_input_price("claude-haiku-4-5")
-        assert price == 0.0008
+        assert price == pytest.approx(0.0008)
 
 
 # ---------------------------------------------------------------------------
@@ -104,12 +110,16 @@ class TestAnthropicProvider:
 # ---------------------------------------------------------------------------
 
 def _make_mock_anthropic_response(model="claude-haiku-4-5", input_tokens=10, output_tokens=20):
-    resp = Mock()
-    resp.model = model
-    resp.usage = Mock()
-    resp.usage.input_tokens = input_tokens
-    resp.usage.output_tokens = output_tokens
-    return resp
+    return _AnthroResp(_AnthroUsage(input_tokens, output_tokens), model=model)
+
+
+# Factory tests never touch the SDK client, so every constructor call can
+# hand back one shared stand-in
+_FAKE_SDK_CLIENT = object()
+
+
+def _fake_sdk_cls(**kwargs):
+    return _FAKE_SDK_CLIENT
 
 
 def _make_wrapped_client(budget_usd=5.0):
@@ -141,6 +151,10 @@ class TestAnthropicClientWrapper:
         assert session.get_total_spent() > 0
         assert session.get_remaining_budget() < 5.0
 
+    def test_messages_wrapper_shared_across_accesses(self):
+        session, wrapped, mock_messages = _make_wrapped_client()
+        assert wrapped.messages is wrapped.messages
+
     def test_budget_exceeded_raises(self):
         session, wrapped, mock_messages = _make_wrapped_client(budget_usd=0.000001)
 
@@ -168,7 +182,7 @@ class TestAnthropicClientWrapper:
 
         assert result is None
         assert len(captured) == 1
-        assert isinstance(captured[0], BudgetExceededError)
+        assert type(captured[0]) is BudgetExceededError
 
     def test_api_failure_rolls_back(self):
         session, wrapped, mock_messages = _make_wrapped_client(budget_usd=5.0)
@@ -182,8 +196,9 @@ class TestAnthropicClientWrapper:
             )
 
         # No spend should have been committed
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
 
     def test_warning_callback_fires(self):
         warnings = []
@@ -214,6 +229,32 @@ class TestAnthropicClientWrapper:
         threshold_50 = [w for w in warnings if w["threshold"] == 50]
         assert len(threshold_50) == 1
 
+    def test_fired_thresholds_still_accepted(self):
+        """Thresholds passed in as already fired are not fired again."""
+        warnings = []
+        tracker = SpendTracker(budget_usd=0.0005)
+        mock_sdk = Mock()
+        mock_sdk.messages.create.return_value = _make_mock_anthropic_response(
+            input_tokens=10, output_tokens=20
+        )
+        wrapped = AnthropicClientWrapper(
+            mock_sdk,
+            tracker,
+            AnthropicProvider(),
+            on_warning=warnings.append,
+            warning_thresholds=[10, 90],
+            fired_thresholds={10},
+        )
+
+        wrapped.messages.create(
+            model="claude-haiku-4-5",
+            max_tokens=20,
+            messages=[{"role": "user", "content": "Hi"}],
+        )
+
+        assert tracker.get_fired_mask() == 0b01
+        assert warnings == []
+
     def test_non_messages_attrs_forwarded(self):
         """Attributes other than .messages should pass through to the SDK client."""
         session = BudgetedSession(budget_usd=5.0)
@@ -223,12 +264,10 @@ class TestAnthropicClientWrapper:
 
         assert wrapped.some_attr == "hello"
 
-    def test_session_attached(self):
-        mock_sdk = Mock()
-        mock_sdk_cls = Mock(return_value=mock_sdk)
+    def test_session_attached(self, fake_sdks):
+        fake_sdks["anthropic"].Anthropic = _fake_sdk_cls
 
-        with patch.dict("sys.modules", {"anthropic": Mock(Anthropic=mock_sdk_cls)}):
-            client = BudgetedSession.anthropic(budget_usd=3.0, api_key="test")
+        client = BudgetedSession.anthropic(budget_usd=3.0, api_key="test")
 
         assert client.session is not None
         assert client.session.get_budget() == 3.0
@@ -1,75 +1,212 @@
 """Tests for async support across all three providers."""
 
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from agent_budget_guard import BudgetedSession, BudgetExceededError
+from agent_budget_guard.tracking.tracker import SpendTracker
+
+# Async tests in this module share one event loop instead of a fresh loop each
+pytestmark = pytest.mark.asyncio(loop_scope="module")
 
 
 # ---------------------------------------------------------------------------
 # Async iterator helpers (mock streaming responses)
 # ---------------------------------------------------------------------------
 
-async def async_iter(items):
-    for item in items:
-        yield item
+class _ListAIter:
+    """Minimal async iterator over a fixed list (no async-generator frame)."""
+
+    __slots__ = ("_it",)
+
+    def __init__(self, items):
+        self._it = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+def stub_async(return_value):
+    """Non-recording async callable returning return_value.
+
+    Use instead of AsyncMock when the test never inspects the call.
+    """
+    async def _stub(*args, **kwargs):
+        return return_value
+    return _stub
+
+
+def record_async_kwargs(return_value):
+    """Async callable returning return_value that records the kwargs it receives.
+
+    Returns (callable, captured) where captured is the recorded kwargs dict.
+    """
+    captured = {}
+
+    async def _record(**kwargs):
+        captured.update(kwargs)
+        return return_value
+    return _record, captured
+
+
+class _ForbidAccess:
+    """Upstream SDK stand-in that fails the test if the wrapper touches it."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"SDK accessed: {name}")
+
+
+class _Stub:
+    """Plain attribute holder for SDK payloads; far cheaper than a Mock tree."""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+
+class _OpenAIUsage(_Stub):
+    __slots__ = ("prompt_tokens", "completion_tokens")
+
+
+class _OpenAIDelta(_Stub):
+    __slots__ = ("content",)
+
+
+class _OpenAIChoice(_Stub):
+    __slots__ = ("delta",)
+
+
+class _OpenAIChunk(_Stub):
+    __slots__ = ("usage", "choices", "model")
+
+
+class _OpenAIResponse(_Stub):
+    __slots__ = ("model", "usage")
+
 
+class _AnthropicUsage(_Stub):
+    __slots__ = ("input_tokens", "output_tokens")
+
+
+class _AnthropicMessage(_Stub):
+    __slots__ = ("usage",)
+
+
+class _AnthropicEvent(_Stub):
+    __slots__ = ("type", "message", "usage")
+
+
+class _AnthropicResponse(_Stub):
+    __slots__ = ("model", "usage")
+
+
+class _GoogleUsageMetadata(_Stub):
+    __slots__ = ("prompt_token_count", "candidates_token_count")
+
+
+class _GoogleChunk(_Stub):
+    __slots__ = ("usage_metadata",)
+
+
+# Builders return fresh stubs on every call so no test can see another's
+# payloads.
 
 def _make_openai_usage(prompt_tokens=10, completion_tokens=20):
-    usage = Mock()
-    usage.prompt_tokens = prompt_tokens
-    usage.completion_tokens = completion_tokens
-    return usage
+    return _OpenAIUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
 
 
 def _make_openai_chunk(usage=None, content="hello"):
-    chunk = Mock()
-    chunk.usage = usage
-    chunk.choices = [Mock()]
-    chunk.choices[0].delta = Mock()
-    chunk.choices[0].delta.content = content
-    chunk.model = "gpt-4o-mini"
-    return chunk
+    return _OpenAIChunk(
+        usage=usage,
+        choices=[_OpenAIChoice(delta=_OpenAIDelta(content=content))],
+        model="gpt-4o-mini",
+    )
 
 
 def _make_openai_response(model="gpt-4o-mini", prompt_tokens=10, completion_tokens=20):
-    resp = Mock()
-    resp.model = model
-    resp.usage = Mock()
-    resp.usage.prompt_tokens = prompt_tokens
-    resp.usage.completion_tokens = completion_tokens
-    return resp
+    return _OpenAIResponse(model=model, usage=_make_openai_usage(prompt_tokens, completion_tokens))
 
 
-def _make_anthropic_event(event_type, **kwargs):
-    event = Mock()
-    event.type = event_type
+def _make_anthropic_event(event_type, input_tokens=10, output_tokens=20):
     if event_type == "message_start":
-        event.message = Mock()
-        event.message.usage = Mock()
-        event.message.usage.input_tokens = kwargs.get("input_tokens", 10)
-    elif event_type == "message_delta":
-        event.usage = Mock()
-        event.usage.output_tokens = kwargs.get("output_tokens", 20)
-    return event
+        return _AnthropicEvent(
+            type=event_type,
+            message=_AnthropicMessage(usage=_AnthropicUsage(input_tokens=input_tokens)),
+        )
+    if event_type == "message_delta":
+        return _AnthropicEvent(
+            type=event_type, usage=_AnthropicUsage(output_tokens=output_tokens)
+        )
+    return _AnthropicEvent(type=event_type)
 
 
 def _make_anthropic_response(model="claude-haiku-4-5", input_tokens=10, output_tokens=20):
-    resp = Mock()
-    resp.model = model
-    resp.usage = Mock()
-    resp.usage.input_tokens = input_tokens
-    resp.usage.output_tokens = output_tokens
-    return resp
+    return _AnthropicResponse(
+        model=model,
+        usage=_AnthropicUsage(input_tokens=input_tokens, output_tokens=output_tokens),
+    )
 
 
 def _make_google_chunk(prompt_token_count=10, candidates_token_count=20):
-    chunk = Mock()
-    chunk.usage_metadata = Mock()
-    chunk.usage_metadata.prompt_token_count = prompt_token_count
-    chunk.usage_metadata.candidates_token_count = candidates_token_count
-    return chunk
+    return _GoogleChunk(
+        usage_metadata=_GoogleUsageMetadata(
+            prompt_token_count=prompt_token_count,
+            candidates_token_count=candidates_token_count,
+        )
+    )
+
+
+# Factory tests never touch the SDK client, so every constructor call can
+# hand back one shared stand-in
+_FAKE_SDK_CLIENT = object()
+
+
+def _fake_sdk_cls(**kwargs):
+    return _FAKE_SDK_CLIENT
+
+
+def _openai_stream_chunks():
+    """Two content chunks followed by the usage-bearing final chunk."""
+    return (
+        _make_openai_chunk(usage=None, content="He"),
+        _make_openai_chunk(usage=None, content="llo"),
+        _make_openai_chunk(usage=_make_openai_usage(10, 20), content=None),
+    )
+
+
+def _openai_usage_only_stream():
+    """A single chunk that carries usage."""
+    return (_make_openai_chunk(usage=_make_openai_usage(5, 10)),)
+
+
+def _anthropic_stream_events():
+    """A complete message stream: start, one delta, usage delta, stop."""
+    return (
+        _make_anthropic_event("message_start", input_tokens=10),
+        _make_anthropic_event("content_block_delta"),
+        _make_anthropic_event("message_delta", output_tokens=20),
+        _make_anthropic_event("message_stop"),
+    )
+
+
+def _google_stream_chunks():
+    """A partial chunk followed by the final chunk with full usage_metadata."""
+    return (
+        _make_google_chunk(prompt_token_count=0, candidates_token_count=5),
+        _make_google_chunk(prompt_token_count=10, candidates_token_count=20),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -86,11 +223,26 @@ class TestAsyncOpenAI:
         wrapped = session.wrap_async_openai(mock_sdk)
         return session, wrapped, mock_completions
 
-    async def test_non_streaming_call_tracked(self):
-        session, wrapped, mock_completions = self._make_session_and_client()
-        mock_completions.create = AsyncMock(
-            return_value=_make_openai_response(prompt_tokens=10, completion_tokens=20)
+    async def test_non_streaming_budget_exceeded_callback(self):
+        captured = []
+        session, wrapped, mock_completions = self._make_session_and_client(
+            budget_usd=0.000001,
+            on_budget_exceeded=lambda e: captured.append(e),
+        )
+
+        result = await wrapped.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Hi"}],
+        )
+
+        assert result is None
+        assert len(captured) == 1
+
+    async def test_unlimited_budget_records_spend(self):
+        session, wrapped, mock_completions = self._make_session_and_client(
+            budget_usd=float("inf")
         )
+        mock_completions.create = AsyncMock(return_value=_make_openai_response())
 
         response = await wrapped.chat.completions.create(
             model="gpt-4o-mini",
@@ -98,11 +250,11 @@ class TestAsyncOpenAI:
         )
 
         assert response is not None
-        assert session.get_total_spent() > 0
+        assert session.get_snapshot()[0] > 0
         assert session.get_reserved() == 0.0
 
-    async def test_non_streaming_budget_exceeded_raises(self):
-        session, wrapped, mock_completions = self._make_session_and_client(budget_usd=0.000001)
+    async def test_zero_budget_still_blocks(self):
+        wrapped, _ = _wrap_openai(BudgetedSession(budget_usd=0.0), _ForbidAccess())
 
         with pytest.raises(BudgetExceededError):
             await wrapped.chat.completions.create(
@@ -110,115 +262,135 @@ class TestAsyncOpenAI:
                 messages=[{"role": "user", "content": "Hi"}],
             )
 
-        mock_completions.create.assert_not_called()
-
-    async def test_non_streaming_budget_exceeded_callback(self):
-        captured = []
-        session, wrapped, mock_completions = self._make_session_and_client(
-            budget_usd=0.000001,
-            on_budget_exceeded=lambda e: captured.append(e),
+    async def test_streaming_commits_only_first_usage_chunk(self):
+        session, wrapped, mock_completions = self._make_session_and_client()
+        chunks = (
+            _make_openai_chunk(usage=_make_openai_usage(10, 20)),
+            _make_openai_chunk(usage=_make_openai_usage(1000, 2000)),
         )
+        mock_completions.create = stub_async(_ListAIter(chunks))
 
-        result = await wrapped.chat.completions.create(
+        received = []
+        async for chunk in await wrapped.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "Hi"}],
-        )
-
-        assert result is None
-        assert len(captured) == 1
+            stream=True,
+        ):
+            received.append(chunk)
 
-    async def test_non_streaming_api_error_rolls_back(self):
-        session, wrapped, mock_completions = self._make_session_and_client()
-        mock_completions.create = AsyncMock(side_effect=RuntimeError("api error"))
+        assert received == list(chunks)
+        spent_once = session.get_total_spent()
 
-        with pytest.raises(RuntimeError, match="api error"):
-            await wrapped.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": "Hi"}],
-            )
+        session.reset()
+        mock_completions.create = stub_async(_ListAIter(chunks[:1]))
+        async for _ in await wrapped.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Hi"}],
+            stream=True,
+        ):
+            pass
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        assert session.get_snapshot() == (spent_once, 0.0)
 
-    async def test_streaming_chunks_yielded_transparently(self):
+    async def test_streaming_stream_options_auto_injected(self):
         session, wrapped, mock_completions = self._make_session_and_client()
-        chunks = [
-            _make_openai_chunk(usage=None, content="He"),
-            _make_openai_chunk(usage=None, content="llo"),
-            _make_openai_chunk(usage=_make_openai_usage(10, 20), content=None),
-        ]
-        mock_completions.create = AsyncMock(return_value=async_iter(chunks))
-
-        gen = await wrapped.chat.completions.create(
+        mock_completions.create, captured = record_async_kwargs(
+            _ListAIter(_openai_usage_only_stream())
+        )
+
+        async for _ in await wrapped.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "Hi"}],
             stream=True,
-        )
+        ):
+            pass
 
-        received = [chunk async for chunk in gen]
-        assert received == chunks
+        assert captured.get("stream_options", {}).get("include_usage") is True
 
-    async def test_streaming_commits_on_final_chunk(self):
+    async def test_streaming_caller_stream_options_not_mutated(self):
         session, wrapped, mock_completions = self._make_session_and_client()
-        chunks = [
-            _make_openai_chunk(usage=None),
-            _make_openai_chunk(usage=_make_openai_usage(10, 20)),
-        ]
-        mock_completions.create = AsyncMock(return_value=async_iter(chunks))
+        mock_completions.create, captured = record_async_kwargs(
+            _ListAIter(_openai_usage_only_stream())
+        )
+        stream_options = {"custom_key": "preserved"}
 
         async for _ in await wrapped.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "Hi"}],
             stream=True,
+            stream_options=stream_options,
         ):
             pass
 
-        assert session.get_total_spent() > 0
-        assert session.get_reserved() == 0.0
+        assert stream_options == {"custom_key": "preserved"}
+        assert captured["stream_options"] == {"custom_key": "preserved", "include_usage": True}
 
-    async def test_streaming_early_exit_rolls_back(self):
-        session, wrapped, mock_completions = self._make_session_and_client()
-        chunks = [
-            _make_openai_chunk(usage=None, content="Hello"),
-            _make_openai_chunk(usage=None, content=" World"),
-            _make_openai_chunk(usage=_make_openai_usage(10, 20), content=None),
-        ]
-        mock_completions.create = AsyncMock(return_value=async_iter(chunks))
-
-        gen = await wrapped.chat.completions.create(
+    async def test_warnings_skip_tracker_once_all_fired(self):
+        warnings = []
+        session, wrapped, mock_completions = self._make_session_and_client(
+            on_warning=warnings.append,
+            warning_thresholds=[0],
+        )
+        mock_completions.create = AsyncMock(return_value=_make_openai_response())
+
+        await wrapped.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "Hi"}],
-            stream=True,
         )
-        async for _ in gen:
-            break
-        await gen.aclose()
+        assert [w["threshold"] for w in warnings] == [0]
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        # SpendTracker uses __slots__, so spy on the class rather than the instance
+        with patch.object(
+            SpendTracker, "snapshot", autospec=True, side_effect=SpendTracker.snapshot
+        ) as spy:
+            await wrapped.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Hi"}],
+            )
+        spy.assert_not_called()
+        assert len(warnings) == 1
 
-    async def test_streaming_stream_options_auto_injected(self):
-        session, wrapped, mock_completions = self._make_session_and_client()
+    async def test_warnings_fire_all_crossed_thresholds_in_order(self):
+        warnings = []
+        session, wrapped, mock_completions = self._make_session_and_client(
+            budget_usd=0.0001,
+            on_warning=warnings.append,
+            warning_thresholds=[90, 10, 5],
+        )
         mock_completions.create = AsyncMock(
-            return_value=async_iter([_make_openai_chunk(usage=_make_openai_usage(5, 10))])
+            return_value=_make_openai_response(prompt_tokens=10, completion_tokens=20)
         )
 
-        async for _ in await wrapped.chat.completions.create(
+        await wrapped.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "Hi"}],
-            stream=True,
-        ):
-            pass
+            max_tokens=20,
+        )
 
-        call_kwargs = mock_completions.create.call_args[1]
-        assert call_kwargs.get("stream_options", {}).get("include_usage") is True
+        assert [w["threshold"] for w in warnings] == [5, 10]
 
-    async def test_factory_method(self):
-        mock_sdk = Mock()
-        mock_sdk_cls = Mock(return_value=mock_sdk)
+    async def test_completions_wrapper_shared_across_accesses(self):
+        session, wrapped, mock_completions = self._make_session_and_client()
+        assert wrapped.chat is wrapped.chat
+        assert wrapped.chat.completions is wrapped.chat.completions
+
+    async def test_client_namespaces_forwarded(self):
+        session, wrapped, mock_completions = self._make_session_and_client()
+        sdk = wrapped._client
+        assert wrapped.models is sdk.models
+        assert wrapped.embeddings is sdk.embeddings
+        assert wrapped.beta is sdk.beta
+        assert wrapped.batches is sdk.batches
+
+    async def test_wrappers_use_slots(self):
+        session, wrapped, mock_completions = self._make_session_and_client()
+        assert not hasattr(wrapped.chat, "__dict__")
+        assert not hasattr(wrapped.chat.completions, "__dict__")
 
-        with patch.dict("sys.modules", {"openai": Mock(AsyncOpenAI=mock_sdk_cls)}):
-            client = BudgetedSession.async_openai(budget_usd=3.0, api_key="test")
+    async def test_factory_method(self, fake_sdks):
+        fake_sdks["openai"].AsyncOpenAI = _fake_sdk_cls
+
+        client = BudgetedSession.async_openai(budget_usd=3.0, api_key="test")
 
         assert client.session is not None
         assert client.session.get_budget() == 3.0
@@ -237,116 +409,14 @@ class TestAsyncAnthropic:
         wrapped = session.wrap_async_anthropic(mock_sdk)
         return session, wrapped, mock_messages
 
-    async def test_non_streaming_call_tracked(self):
-        session, wrapped, mock_messages = self._make_session_and_client()
-        mock_messages.create = AsyncMock(
-            return_value=_make_anthropic_response(input_tokens=10, output_tokens=20)
-        )
-
-        response = await wrapped.messages.create(
-            model="claude-haiku-4-5",
-            max_tokens=100,
-            messages=[{"role": "user", "content": "Hi"}],
-        )
-
-        assert response is not None
-        assert session.get_total_spent() > 0
-        assert session.get_reserved() == 0.0
-
-    async def test_non_streaming_budget_exceeded_raises(self):
-        session, wrapped, mock_messages = self._make_session_and_client(budget_usd=0.000001)
-
-        with pytest.raises(BudgetExceededError):
-            await wrapped.messages.create(
-                model="claude-opus-4-6",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": "Hi"}],
-            )
-
-        mock_messages.create.assert_not_called()
-
-    async def test_non_streaming_api_error_rolls_back(self):
-        session, wrapped, mock_messages = self._make_session_and_client()
-        mock_messages.create = AsyncMock(side_effect=RuntimeError("api error"))
-
-        with pytest.raises(RuntimeError):
-            await wrapped.messages.create(
-                model="claude-haiku-4-5",
-                max_tokens=100,
-                messages=[{"role": "user", "content": "Hi"}],
-            )
-
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
-
-    async def test_streaming_events_yielded_transparently(self):
+    async def test_messages_wrapper_shared_across_accesses(self):
         session, wrapped, mock_messages = self._make_session_and_client()
-        events = [
-            _make_anthropic_event("message_start", input_tokens=10),
-            _make_anthropic_event("content_block_delta"),
-            _make_anthropic_event("message_delta", output_tokens=20),
-            _make_anthropic_event("message_stop"),
-        ]
-        mock_messages.create = AsyncMock(return_value=async_iter(events))
-
-        gen = await wrapped.messages.create(
-            model="claude-haiku-4-5",
-            max_tokens=100,
-            messages=[{"role": "user", "content": "Hi"}],
-            stream=True,
-        )
+        assert wrapped.messages is wrapped.messages
 
-        received = [e async for e in gen]
-        assert received == events
+    async def test_factory_method(self, fake_sdks):
+        fake_sdks["anthropic"].AsyncAnthropic = _fake_sdk_cls
 
-    async def test_streaming_commits_after_message_delta(self):
-        session, wrapped, mock_messages = self._make_session_and_client()
-        events = [
-            _make_anthropic_event("message_start", input_tokens=10),
-            _make_anthropic_event("message_delta", output_tokens=20),
-            _make_anthropic_event("message_stop"),
-        ]
-        mock_messages.create = AsyncMock(return_value=async_iter(events))
-
-        async for _ in await wrapped.messages.create(
-            model="claude-haiku-4-5",
-            max_tokens=100,
-            messages=[{"role": "user", "content": "Hi"}],
-            stream=True,
-        ):
-            pass
-
-        assert session.get_total_spent() > 0
-        assert session.get_reserved() == 0.0
-
-    async def test_streaming_early_exit_rolls_back(self):
-        session, wrapped, mock_messages = self._make_session_and_client()
-        events = [
-            _make_anthropic_event("message_start", input_tokens=10),
-            _make_anthropic_event("content_block_delta"),
-            _make_anthropic_event("message_delta", output_tokens=20),
-        ]
-        mock_messages.create = AsyncMock(return_value=async_iter(events))
-
-        gen = await wrapped.messages.create(
-            model="claude-haiku-4-5",
-            max_tokens=100,
-            messages=[{"role": "user", "content": "Hi"}],
-            stream=True,
-        )
-        async for _ in gen:
-            break
-        await gen.aclose()
-
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
-
-    async def test_factory_method(self):
-        mock_sdk = Mock()
-        mock_sdk_cls = Mock(return_value=mock_sdk)
-
-        with patch.dict("sys.modules", {"anthropic": Mock(AsyncAnthropic=mock_sdk_cls)}):
-            client = BudgetedSession.async_anthropic(budget_usd=3.0, api_key="test")
+        client = BudgetedSession.async_anthropic(budget_usd=3.0, api_key="test")
 
         assert client.session is not None
         assert client.session.get_budget() == 3.0
@@ -366,104 +436,280 @@ class TestAsyncGoogle:
         wrapped = session.wrap_async_google(mock_sdk)
         return session, wrapped, mock_aio_models
 
-    async def test_non_streaming_call_tracked(self):
-        session, wrapped, mock_models = self._make_session_and_client()
-        mock_models.generate_content = AsyncMock(
-            return_value=_make_google_chunk(prompt_token_count=10, candidates_token_count=20)
-        )
-
-        response = await wrapped.models.generate_content(
-            model="gemini-2.0-flash",
-            contents="Hello",
-        )
-
-        assert response is not None
-        assert session.get_total_spent() > 0
-        assert session.get_reserved() == 0.0
+    async def test_models_wrapper_shared_across_accesses(self):
+        session, wrapped, mock_aio_models = self._make_session_and_client()
+        assert wrapped.models is wrapped.models
 
-    async def test_non_streaming_budget_exceeded_raises(self):
-        session, wrapped, mock_models = self._make_session_and_client(budget_usd=0.000001)
+    async def test_streaming_budget_exceeded_raises(self):
+        wrapped, _ = _wrap_google(BudgetedSession(budget_usd=0.000001), _ForbidAccess())
 
         with pytest.raises(BudgetExceededError):
-            await wrapped.models.generate_content(
+            await wrapped.models.generate_content_stream(
                 model="gemini-2.0-flash",
                 contents="Hello",
             )
 
-        mock_models.generate_content.assert_not_called()
 
-    async def test_non_streaming_api_error_rolls_back(self):
-        session, wrapped, mock_models = self._make_session_and_client()
-        mock_models.generate_content = AsyncMock(side_effect=RuntimeError("api error"))
+# ---------------------------------------------------------------------------
+# Scenarios shared by all three providers
+# ---------------------------------------------------------------------------
 
-        with pytest.raises(RuntimeError):
-            await wrapped.models.generate_content(
-                model="gemini-2.0-flash",
-                contents="Hello",
-            )
+_USER_HI = [{"role": "user", "content": "Hi"}]
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """How to drive one provider's async wrapper through the shared scenarios."""
+
+    name: str
+    wrap: Callable[..., Tuple[Any, Any]]                  # (session, upstream) -> (wrapped, sdk)
+    call: Callable[[Any, bool], Any]                      # (wrapped, stream) -> awaitable
+    method: str                                           # SDK method for non-streaming
+    stream_method: str                                    # SDK method for streaming
+    stream_awaited: bool                                  # is the SDK stream method awaited?
+    response: Callable[[], Any]
+    stream_payload: Callable[[], Tuple[Any, ...]]         # items the SDK stream yields
+    usage_index: Optional[int]                            # item that completes usage, if known
+    estimate_target: str                                  # patch path of the cost estimator
+
+    def stub_upstream(self, sdk: Mock, **mock_kwargs: Any) -> AsyncMock:
+        """Replace the SDK's non-streaming method with a recording mock."""
+        mock = AsyncMock(**mock_kwargs)
+        setattr(sdk, self.method, mock)
+        return mock
+
+    def stub_stream(self, sdk: Mock, payload: Any) -> None:
+        """Make the SDK's streaming method stream payload, without recording calls.
+
+        payload is either a tuple of items or a ready-made async iterator.
+        """
+        stream = _ListAIter(payload) if isinstance(payload, tuple) else payload
+        if self.stream_awaited:
+            stub = stub_async(stream)
+        else:
+            def stub(*args, **kwargs):
+                return stream
+        setattr(sdk, self.stream_method, stub)
+
+
+def _wrap_openai(session, upstream=None):
+    sdk = Mock()
+    if upstream is not None:
+        sdk.chat.completions = upstream
+    return session.wrap_async_openai(sdk), sdk.chat.completions
+
+
+def _call_openai(wrapped, stream):
+    kwargs = {"stream": True} if stream else {}
+    return wrapped.chat.completions.create(model="gpt-4o-mini", messages=_USER_HI, **kwargs)
+
+
+def _wrap_anthropic(session, upstream=None):
+    sdk = Mock()
+    if upstream is not None:
+        sdk.messages = upstream
+    return session.wrap_async_anthropic(sdk), sdk.messages
+
+
+def _call_anthropic(wrapped, stream):
+    kwargs = {"stream": True} if stream else {}
+    return wrapped.messages.create(
+        model="claude-haiku-4-5", max_tokens=100, messages=_USER_HI, **kwargs
+    )
+
+
+def _wrap_google(session, upstream=None):
+    sdk = Mock()
+    if upstream is not None:
+        sdk.aio.models = upstream
+    return session.wrap_async_google(sdk), sdk.aio.models
+
+
+def _call_google(wrapped, stream):
+    method = wrapped.models.generate_content_stream if stream else wrapped.models.generate_content
+    return method(model="gemini-2.0-flash", contents="Hello")
+
+
+PROVIDERS = [
+    ProviderSpec(
+        name="openai",
+        wrap=_wrap_openai,
+        call=_call_openai,
+        method="create",
+        stream_method="create",
+        stream_awaited=True,
+        response=_make_openai_response,
+        stream_payload=_openai_stream_chunks,
+        usage_index=2,
+        estimate_target="agent_budget_guard.cost.estimator.CostEstimator"
+                        ".estimate_chat_completion_cost",
+    ),
+    ProviderSpec(
+        name="anthropic",
+        wrap=_wrap_anthropic,
+        call=_call_anthropic,
+        method="create",
+        stream_method="create",
+        stream_awaited=True,
+        response=_make_anthropic_response,
+        stream_payload=_anthropic_stream_events,
+        usage_index=2,
+        estimate_target="agent_budget_guard.providers.anthropic_provider.AnthropicProvider"
+                        ".estimate_cost",
+    ),
+    ProviderSpec(
+        name="google",
+        wrap=_wrap_google,
+        call=_call_google,
+        method="generate_content",
+        stream_method="generate_content_stream",
+        stream_awaited=False,
+        response=_make_google_chunk,
+        stream_payload=_google_stream_chunks,
+        # Every chunk carries usage_metadata, so none marks the end early
+        usage_index=None,
+        estimate_target="agent_budget_guard.providers.google_provider.GoogleProvider"
+                        ".estimate_cost",
+    ),
+]
+
+
+@pytest.fixture(params=PROVIDERS, ids=lambda spec: spec.name)
+def provider(request):
+    return request.param
+
+
+class TestAsyncProviders:
+    async def test_non_streaming_call_tracked(self, provider):
+        session = BudgetedSession(budget_usd=5.0)
+        wrapped, sdk = provider.wrap(session)
+        provider.stub_upstream(sdk, return_value=provider.response())
+
+        response = await provider.call(wrapped, False)
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        assert response is not None
+        spent, reserved = session.get_snapshot()
+        assert spent > 0
+        assert reserved == 0.0
 
-    async def test_streaming_chunks_yielded_transparently(self):
-        session, wrapped, mock_models = self._make_session_and_client()
-        chunks = [
-            _make_google_chunk(prompt_token_count=0, candidates_token_count=5),
-            _make_google_chunk(prompt_token_count=10, candidates_token_count=20),
-        ]
-        mock_models.generate_content_stream = Mock(return_value=async_iter(chunks))
-
-        gen = await wrapped.models.generate_content_stream(
-            model="gemini-2.0-flash",
-            contents="Hello",
-        )
+    async def test_non_streaming_budget_exceeded_raises(self, provider):
+        # The budget check must reject the call before the SDK is touched
+        wrapped, _ = provider.wrap(BudgetedSession(budget_usd=0.000001), _ForbidAccess())
 
-        received = [chunk async for chunk in gen]
-        assert received == chunks
+        with pytest.raises(BudgetExceededError):
+            await provider.call(wrapped, False)
 
-    async def test_streaming_commits_from_last_chunk(self):
-        session, wrapped, mock_models = self._make_session_and_client()
-        chunks = [
-            _make_google_chunk(prompt_token_count=0, candidates_token_count=5),
-            _make_google_chunk(prompt_token_count=10, candidates_token_count=20),
-        ]
-        mock_models.generate_content_stream = Mock(return_value=async_iter(chunks))
+    async def test_non_streaming_api_error_rolls_back(self, provider):
+        session = BudgetedSession(budget_usd=5.0)
+        wrapped, sdk = provider.wrap(session)
+        provider.stub_upstream(sdk, side_effect=RuntimeError("api error"))
 
-        async for _ in await wrapped.models.generate_content_stream(
-            model="gemini-2.0-flash",
-            contents="Hello",
-        ):
+        with pytest.raises(RuntimeError, match="api error"):
+            await provider.call(wrapped, False)
+
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
+
+    async def test_unlimited_budget_skips_estimate(self, provider):
+        session = BudgetedSession(budget_usd=float("inf"))
+        wrapped, sdk = provider.wrap(session)
+        provider.stub_upstream(sdk, return_value=provider.response())
+
+        with patch(provider.estimate_target) as estimate:
+            response = await provider.call(wrapped, False)
+
+        estimate.assert_not_called()
+        assert response is not None
+        assert session.get_snapshot()[0] > 0
+
+    async def test_non_streaming_cancellation_rolls_back(self, provider):
+        session = BudgetedSession(budget_usd=5.0)
+        wrapped, sdk = provider.wrap(session)
+        provider.stub_upstream(sdk, side_effect=asyncio.CancelledError())
+
+        with pytest.raises(asyncio.CancelledError):
+            await provider.call(wrapped, False)
+
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
+
+    async def test_streaming_yielded_transparently(self, provider):
+        session = BudgetedSession(budget_usd=5.0)
+        wrapped, sdk = provider.wrap(session)
+        payload = provider.stream_payload()
+        provider.stub_stream(sdk, payload)
+
+        received = []
+        async for item in await provider.call(wrapped, True):
+            received.append(item)
+
+        assert received == list(payload)
+
+    async def test_streaming_commits_on_completion(self, provider):
+        session = BudgetedSession(budget_usd=5.0)
+        wrapped, sdk = provider.wrap(session)
+        provider.stub_stream(sdk, provider.stream_payload())
+
+        async for _ in await provider.call(wrapped, True):
             pass
 
-        assert session.get_total_spent() > 0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent > 0
+        assert reserved == 0.0
+
+    async def test_streaming_stop_after_usage_commits(self, provider):
+        # A consumer that stops as soon as usage arrives is still charged
+        if provider.usage_index is None:
+            pytest.skip("only an exhausted stream marks its usage as final")
+        session = BudgetedSession(budget_usd=5.0)
+        wrapped, sdk = provider.wrap(session)
+        payload = provider.stream_payload()
+        provider.stub_stream(sdk, payload)
+
+        gen = await provider.call(wrapped, True)
+        async for item in gen:
+            if item is payload[provider.usage_index]:
+                break
+        await gen.aclose()
 
-    async def test_streaming_early_exit_rolls_back(self):
-        session, wrapped, mock_models = self._make_session_and_client()
-        chunks = [
-            _make_google_chunk(prompt_token_count=0, candidates_token_count=5),
-            _make_google_chunk(prompt_token_count=10, candidates_token_count=20),
-        ]
-        mock_models.generate_content_stream = Mock(return_value=async_iter(chunks))
-
-        gen = await wrapped.models.generate_content_stream(
-            model="gemini-2.0-flash",
-            contents="Hello",
-        )
+        spent, reserved = session.get_snapshot()
+        assert spent > 0
+        assert reserved == 0.0
+
+    async def test_streaming_early_exit_rolls_back(self, provider):
+        session = BudgetedSession(budget_usd=5.0)
+        wrapped, sdk = provider.wrap(session)
+        provider.stub_stream(sdk, provider.stream_payload())
+
+        gen = await provider.call(wrapped, True)
         async for _ in gen:
             break
         await gen.aclose()
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
 
-    async def test_streaming_budget_exceeded_raises(self):
-        session, wrapped, mock_models = self._make_session_and_client(budget_usd=0.000001)
+    async def test_streaming_early_exit_closes_upstream(self, provider):
+        session = BudgetedSession(budget_usd=5.0)
+        wrapped, sdk = provider.wrap(session)
+        closed = []
 
-        with pytest.raises(BudgetExceededError):
-            await wrapped.models.generate_content_stream(
-                model="gemini-2.0-flash",
-                contents="Hello",
-            )
+        async def upstream():
+            try:
+                for item in provider.stream_payload():
+                    yield item
+            finally:
+                closed.append(True)
+
+        provider.stub_stream(sdk, upstream())
 
-        mock_models.generate_content_stream.assert_not_called()
+        gen = await provider.call(wrapped, True)
+        async for _ in gen:
+            break
+        await gen.aclose()
+
+        assert closed == [True]
+        assert session.get_reserved() == 0.0
@@ -1,35 +1,28 @@
 """Test pricing table functionality."""
 
 import pytest
-from agent_budget_guard.cost.pricing import PricingTable
 from agent_budget_guard.exceptions import PricingDataError
 
 
-def test_get_input_price():
+def test_get_input_price(pricing):
     """Test getting input price for a model."""
-    pricing = PricingTable()
-
     # GPT-4o-mini should be cheapest
     price = pricing.get_input_price("gpt-4o-mini")
-    assert price == 0.00015
+    assert price == pytest.approx(0.00015)
 
     # GPT-5.2 should be more expensive
     price_52 = pricing.get_input_price("gpt-5.2")
     assert price_52 > price
 
 
-def test_get_output_price():
+def test_get_output_price(pricing):
     """Test getting output price for a model."""
-    pricing = PricingTable()
-
     price = pricing.get_output_price("gpt-4o-mini")
-    assert price == 0.0006
+    assert price == pytest.approx(0.0006)
 
 
-def test_batch_tier_pricing():
+def test_batch_tier_pricing(pricing):
     """Test batch tier pricing is cheaper."""
-    pricing = PricingTable()
-
     standard = pricing.get_input_price("gpt-5.2", tier="standard")
     batch = pricing.get_input_price("gpt-5.2", tier="batch")
 
@@ -37,10 +30,26 @@ def test_batch_tier_pricing():
     assert batch == standard / 2  # Batch is 50% discount
 
 
-def test_model_alias():
-    """Test that model aliases resolve correctly."""
-    pricing = PricingTable()
+def test_get_prices(pricing):
+    """Test fetching both prices at once matches the single-price getters."""
+    for tier in ("standard", "batch"):
+        assert pricing.get_prices("gpt-5.2", tier=tier) == (
+            pricing.get_input_price("gpt-5.2", tier=tier),
+            pricing.get_output_price("gpt-5.2", tier=tier),
+        )
 
+
+def test_get_per_token(pricing):
+    """Test per-token rates are the per-1K prices divided by 1000."""
+    for tier in ("standard", "batch"):
+        input_price, output_price = pricing.get_prices("gpt-4o-mini", tier=tier)
+        input_rate, output_rate = pricing.get_per_token("gpt-4o-mini", tier=tier)
+        assert input_rate == pytest.approx(input_price / 1000)
+        assert output_rate == pytest.approx(output_price / 1000)
+
+
+def test_model_alias(pricing):
+    """Test that model aliases resolve correctly."""
     # gpt-4-0613 should resolve to gpt-4
     price = pricing.get_input_price("gpt-4-0613")
     gpt4_price = pricing.get_input_price("gpt-4")
@@ -48,18 +57,14 @@ def test_model_alias():
     assert price == gpt4_price
 
 
-def test_unknown_model_error():
+def test_unknown_model_error(pricing):
     """Test that unknown models raise error."""
-    pricing = PricingTable()
-
     with pytest.raises(PricingDataError):
         pricing.get_input_price("gpt-99-ultra")
 
 
-def test_is_reasoning_model():
+def test_is_reasoning_model(pricing):
     """Test reasoning model detection."""
-    pricing = PricingTable()
-
     # O-series should be detected as reasoning models
     assert pricing.is_reasoning_model("o1")
     assert pricing.is_reasoning_model("o3")
@@ -70,10 +75,8 @@ def test_is_reasoning_model():
     assert not pricing.is_reasoning_model("gpt-4o")
 
 
-def test_get_encoding():
+def test_get_encoding(pricing):
     """Test getting model encoding."""
-    pricing = PricingTable()
-
     # Newer models use o200k_base
     assert pricing.get_model_encoding("gpt-5.2") == "o200k_base"
     assert pricing.get_model_encoding("gpt-4o") == "o200k_base"
@@ -81,3 +84,17 @@ def test_get_encoding():
     # Older models use cl100k_base
     assert pricing.get_model_encoding("gpt-4") == "cl100k_base"
     assert pricing.get_model_encoding("gpt-3.5-turbo") == "cl100k_base"
+
+
+def test_estimate_from_token_count_matches_message_estimate(pricing):
+    """Test pre-counted token estimates match tokenizing the messages."""
+    from agent_budget_guard.cost.estimator import CostEstimator
+    from agent_budget_guard.utils.tokens import count_message_tokens
+
+    estimator = CostEstimator(pricing)
+    messages = [{"role": "user", "content": "Hello there"}]
+    input_tokens = count_message_tokens(messages, pricing.get_model_encoding("gpt-4o-mini"))
+
+    assert estimator.estimate_from_token_count(
+        "gpt-4o-mini", input_tokens, max_tokens=50
+    ) == estimator.estimate_chat_completion_cost("gpt-4o-mini", messages, max_tokens=50)
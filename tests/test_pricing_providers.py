@@ -6,44 +6,53 @@ from agent_budget_guard.exceptions import PricingDataError
 
 
 class TestPricingTableProviders:
-    def test_openai_prices(self):
-        pricing = PricingTable(provider="openai")
-        assert pricing.get_input_price("gpt-4o-mini") == 0.00015
-        assert pricing.get_output_price("gpt-4o-mini") == 0.0006
-        # Default (no provider arg) also loads OpenAI
-        assert PricingTable().get_input_price("gpt-4o-mini") == 0.00015
+    @pytest.mark.parametrize("provider,model,field,expected", [
+        ("openai", "gpt-4o-mini", "input", 0.00015),
+        ("openai", "gpt-4o-mini", "output", 0.0006),
+        ("anthropic", "claude-haiku-4-5", "input", 0.0008),
+        ("anthropic", "claude-haiku-4-5", "output", 0.004),
+        ("google", "gemini-2.0-flash", "input", 0.0001),
+        ("google", "gemini-2.0-flash", "output", 0.0004),
+    ])
+    def test_price(self, provider, model, field, expected):
+        pricing = PricingTable(provider=provider)
+        input_price, output_price = pricing.get_prices(model)
+        price = input_price if field == "input" else output_price
+        assert price == pytest.approx(expected)
 
-    def test_anthropic_prices(self):
-        pricing = PricingTable(provider="anthropic")
-        assert pricing.get_input_price("claude-haiku-4-5") == 0.0008
-        assert pricing.get_output_price("claude-haiku-4-5") == 0.004
-
-    def test_google_prices(self):
-        pricing = PricingTable(provider="google")
-        assert pricing.get_input_price("gemini-2.0-flash") == 0.0001
-        assert pricing.get_output_price("gemini-2.0-flash") == 0.0004
+    def test_default_provider_is_openai(self):
+        assert PricingTable().get_input_price("gpt-4o-mini") == pytest.approx(0.00015)
 
-    def test_anthropic_opus_more_expensive_than_haiku(self):
-        pricing = PricingTable(provider="anthropic")
-        haiku = pricing.get_input_price("claude-haiku-4-5")
-        opus = pricing.get_input_price("claude-opus-4-6")
-        assert opus > haiku
+    @pytest.mark.parametrize("provider,cheaper,pricier", [
+        ("anthropic", "claude-haiku-4-5", "claude-opus-4-6"),
+        ("google", "gemini-2.0-flash", "gemini-1.5-pro"),
+    ])
+    def test_larger_model_is_more_expensive(self, provider, cheaper, pricier):
+        pricing = PricingTable(provider=provider)
+        assert pricing.get_input_price(pricier) > pricing.get_input_price(cheaper)
 
-    def test_anthropic_model_alias(self):
-        pricing = PricingTable(provider="anthropic")
-        assert pricing.get_input_price("claude-sonnet-latest") == pricing.get_input_price("claude-sonnet-4-6")
-
-    def test_anthropic_versioned_model_resolves(self):
-        pricing = PricingTable(provider="anthropic")
-        assert pricing.get_input_price("claude-3-5-sonnet-20241022") == pricing.get_input_price("claude-3-5-sonnet")
+    @pytest.mark.parametrize("provider,model,canonical", [
+        ("anthropic", "claude-sonnet-latest", "claude-sonnet-4-6"),
+        ("anthropic", "claude-3-5-sonnet-20241022", "claude-3-5-sonnet"),
+        ("google", "gemini-2.0-flash-001", "gemini-2.0-flash"),
+    ])
+    def test_alias_and_versioned_names_resolve(self, provider, model, canonical):
+        pricing = PricingTable(provider=provider)
+        assert pricing.get_prices(model) == pricing.get_prices(canonical)
 
-    def test_google_pro_more_expensive_than_flash(self):
+    def test_resolved_model_names_are_cached(self):
         pricing = PricingTable(provider="google")
-        assert pricing.get_input_price("gemini-1.5-pro") > pricing.get_input_price("gemini-2.0-flash")
+        pricing.get_input_price("gemini-2.0-flash-001")
+        assert pricing._resolve_cache == {"gemini-2.0-flash-001": "gemini-2.0-flash"}
+        # Unknown models are not cached
+        with pytest.raises(PricingDataError):
+            pricing.get_input_price("not-a-model")
+        assert "not-a-model" not in pricing._resolve_cache
 
-    def test_google_versioned_model_resolves(self):
-        pricing = PricingTable(provider="google")
-        assert pricing.get_input_price("gemini-2.0-flash-001") == pricing.get_input_price("gemini-2.0-flash")
+    def test_resolved_name_is_the_models_key(self):
+        pricing = PricingTable(provider="anthropic")
+        canonical = pricing._resolve_model("claude-3-5-sonnet-20241022")
+        assert any(key is canonical for key in pricing._models)
 
     def test_unknown_provider_raises(self):
         with pytest.raises(PricingDataError, match="Unknown provider"):
@@ -56,6 +65,23 @@ class TestPricingTableProviders:
         with pytest.raises(PricingDataError):
             PricingTable(provider="google").get_input_price("claude-haiku-4-5")
 
+    def test_builtin_tables_share_parsed_config(self):
+        """Built-in pricing files are parsed once and reused across instances."""
+        first = PricingTable(provider="anthropic")
+        second = PricingTable(provider="anthropic")
+        google = PricingTable(provider="google")
+        first.get_input_price("claude-haiku-4-5")
+        second.get_input_price("claude-haiku-4-5")
+        google.get_input_price("gemini-2.0-flash")
+        assert first._models is second._models
+        assert google._models is not first._models
+
+    def test_builtin_table_loads_on_first_lookup(self):
+        pricing = PricingTable(provider="google")
+        assert pricing._data is None
+        assert pricing.get_per_token("gemini-2.0-flash") == pytest.approx((1e-7, 4e-7))
+        assert pricing._data is not None
+
     def test_custom_config_path_still_works(self, tmp_path):
         """config_path kwarg overrides provider selection."""
         import json
@@ -74,5 +100,4 @@ class TestPricingTableProviders:
         config_file.write_text(json.dumps(custom))
 
         pricing = PricingTable(config_path=str(config_file))
-        assert pricing.get_input_price("my-model") == 0.1
-        assert pricing.get_output_price("my-model") == 0.2
+        assert pricing.get_prices("my-model") == pytest.approx((0.1, 0.2))
@@ -1,5 +1,7 @@
 """Test BudgetedSession functionality."""
 
+import weakref
+
 import pytest
 from unittest.mock import Mock, MagicMock
 from agent_budget_guard import BudgetedSession, BudgetExceededError
@@ -88,6 +90,46 @@ def test_get_summary():
     assert summary['utilization_percent'] == 0.0
 
 
+def test_sessions_share_default_pricing():
+    """Sessions without a custom pricing config share one parsed pricing file."""
+    first = BudgetedSession(budget_usd=1.0)
+    second = BudgetedSession(budget_usd=2.0)
+    first._pricing.get_prices("gpt-4o-mini")
+    second._pricing.get_prices("gpt-4o-mini")
+
+    assert first._pricing._data is second._pricing._data
+
+
+def test_clear_pricing_cache():
+    """After clearing, new sessions re-read the built-in pricing file."""
+    before = BudgetedSession(budget_usd=1.0)._pricing
+    before.get_prices("gpt-4o-mini")
+
+    BudgetedSession.clear_pricing_cache()
+    after = BudgetedSession(budget_usd=1.0)._pricing
+    after.get_prices("gpt-4o-mini")
+
+    assert after._data is not before._data
+    assert after._data == before._data
+
+
+def test_session_objects_use_slots():
+    """Session, tracker and pricing table carry no __dict__ but stay weak-referenceable."""
+    session = BudgetedSession(budget_usd=1.0)
+
+    for obj in (session, session._tracker, session._pricing):
+        assert not hasattr(obj, "__dict__")
+        assert weakref.ref(obj)() is obj
+
+
+def test_get_snapshot():
+    """Test reading spent and reserved together."""
+    session = BudgetedSession(budget_usd=10.0)
+    session._tracker.check_and_reserve(2.0)
+
+    assert session.get_snapshot() == (0.0, 2.0)
+
+
 def test_reset():
     """After reset, spent returns to zero and the full budget is available again."""
     session = BudgetedSession(budget_usd=5.0)
@@ -111,8 +153,9 @@ def test_reset():
 
     session.reset()
 
-    assert session.get_total_spent() == 0.0
-    assert session.get_reserved() == 0.0
+    spent, reserved = session.get_snapshot()
+    assert spent == 0.0
+    assert reserved == 0.0
     assert session.get_remaining_budget() == 5.0
 
 
@@ -165,7 +208,7 @@ def test_on_budget_exceeded_callback():
 
     assert result is None
     assert len(captured) == 1
-    assert isinstance(captured[0], BudgetExceededError)
+    assert type(captured[0]) is BudgetExceededError
 
 
 def test_on_warning_callback():
@@ -209,6 +252,40 @@ def test_on_warning_callback():
     assert threshold_50[0]["budget"] == 0.001
 
 
+def test_on_warning_payloads_are_independent():
+    """Each warning gets its own dict, so callbacks can keep them."""
+    warnings = []
+    session = BudgetedSession(
+        budget_usd=0.001,
+        on_warning=lambda w: warnings.append(w),
+        warning_thresholds=[10, 90],
+    )
+
+    mock_client = Mock()
+    mock_response = Mock()
+    mock_response.model = "gpt-4o-mini"
+    mock_response.usage = Mock()
+    mock_response.usage.prompt_tokens = 10
+    mock_response.usage.completion_tokens = 20
+    mock_client.chat.completions.create = Mock(return_value=mock_response)
+
+    wrapped = session.wrap_openai(mock_client)
+
+    for _ in range(100):
+        try:
+            wrapped.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Hi"}],
+                max_tokens=20
+            )
+        except BudgetExceededError:
+            break
+
+    assert [w["threshold"] for w in warnings] == [10, 90]
+    assert warnings[0] is not warnings[1]
+    assert warnings[0]["spent"] < warnings[1]["spent"]
+
+
 def test_openai_classmethod():
     """Test the one-liner classmethod."""
     from unittest.mock import patch
@@ -1,5 +1,6 @@
 """Tests for streaming support across all three providers."""
 
+from types import SimpleNamespace
 from unittest.mock import Mock
 
 import pytest
@@ -11,42 +12,55 @@ from agent_budget_guard import BudgetedSession, BudgetExceededError
 # Mock helpers
 # ---------------------------------------------------------------------------
 
+# Payloads are plain namespaces: the wrappers only read these attributes,
+# and Mock's call-recording machinery would dominate per-chunk reads.
+
 def _make_openai_usage(prompt_tokens=10, completion_tokens=20):
-    usage = Mock()
-    usage.prompt_tokens = prompt_tokens
-    usage.completion_tokens = completion_tokens
-    return usage
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
 
 
 def _make_openai_chunk(usage=None, content="hello"):
-    chunk = Mock()
-    chunk.usage = usage
-    chunk.choices = [Mock()]
-    chunk.choices[0].delta = Mock()
-    chunk.choices[0].delta.content = content
-    chunk.model = "gpt-4o-mini"
-    return chunk
+    return SimpleNamespace(
+        usage=usage,
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=content))],
+        model="gpt-4o-mini",
+    )
 
 
 def _make_anthropic_event(event_type, **kwargs):
-    event = Mock()
-    event.type = event_type
+    event = SimpleNamespace(type=event_type)
     if event_type == "message_start":
-        event.message = Mock()
-        event.message.usage = Mock()
-        event.message.usage.input_tokens = kwargs.get("input_tokens", 10)
+        event.message = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=kwargs.get("input_tokens", 10))
+        )
     elif event_type == "message_delta":
-        event.usage = Mock()
-        event.usage.output_tokens = kwargs.get("output_tokens", 20)
+        event.usage = SimpleNamespace(output_tokens=kwargs.get("output_tokens", 20))
     return event
 
 
 def _make_google_chunk(prompt_token_count=10, candidates_token_count=20):
-    chunk = Mock()
-    chunk.usage_metadata = Mock()
-    chunk.usage_metadata.prompt_token_count = prompt_token_count
-    chunk.usage_metadata.candidates_token_count = candidates_token_count
-    return chunk
+    return SimpleNamespace(
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_token_count,
+            candidates_token_count=candidates_token_count,
+        )
+    )
+
+
+def _make_sdk(*path, methods):
+    """Build an SDK stand-in with a method-only Mock at the given namespace path.
+
+    The intermediate namespaces are plain SimpleNamespaces and the leaf Mock
+    is spec_set to ``methods``, so no attribute trees get auto-created.
+
+    Returns:
+        (sdk, leaf) where leaf is the Mock at ``sdk.<path>``
+    """
+    leaf = Mock(spec_set=methods)
+    sdk = leaf
+    for name in reversed(path):
+        sdk = SimpleNamespace(**{name: sdk})
+    return sdk, leaf
 
 
 # ---------------------------------------------------------------------------
@@ -56,13 +70,15 @@ def _make_google_chunk(prompt_token_count=10, candidates_token_count=20):
 class TestOpenAIStreaming:
     def _make_session_and_client(self, budget_usd=5.0, **session_kwargs):
         session = BudgetedSession(budget_usd=budget_usd, **session_kwargs)
-        mock_sdk = Mock()
-        mock_completions = Mock()
-        mock_sdk.chat = Mock()
-        mock_sdk.chat.completions = mock_completions
+        mock_sdk, mock_completions = _make_sdk("chat", "completions", methods=["create"])
         wrapped = session.wrap_openai(mock_sdk)
         return session, wrapped, mock_completions
 
+    def test_completions_wrapper_shared_across_accesses(self):
+        session, wrapped, mock_completions = self._make_session_and_client()
+        assert wrapped.chat is wrapped.chat
+        assert wrapped.chat.completions is wrapped.chat.completions
+
     def test_stream_chunks_yielded_transparently(self):
         session, wrapped, mock_completions = self._make_session_and_client()
         chunks = [
@@ -96,8 +112,9 @@ class TestOpenAIStreaming:
         ):
             pass
 
-        assert session.get_total_spent() > 0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent > 0
+        assert reserved == 0.0
 
     def test_stream_early_exit_rolls_back(self):
         session, wrapped, mock_completions = self._make_session_and_client()
@@ -117,8 +134,32 @@ class TestOpenAIStreaming:
         next(gen)
         gen.close()
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
+
+    def test_stream_exit_after_usage_chunk_commits(self):
+        session, wrapped, mock_completions = self._make_session_and_client()
+        chunks = [
+            _make_openai_chunk(usage=None, content="Hello"),
+            _make_openai_chunk(usage=_make_openai_usage(10, 20), content=None),
+            _make_openai_chunk(usage=None, content=None),
+        ]
+        mock_completions.create.return_value = iter(chunks)
+
+        gen = wrapped.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Hi"}],
+            stream=True,
+        )
+        # Stop as soon as the usage chunk has been received
+        next(gen)
+        next(gen)
+        gen.close()
+
+        spent, reserved = session.get_snapshot()
+        assert spent > 0
+        assert reserved == 0.0
 
     def test_stream_exception_rolls_back(self):
         session, wrapped, mock_completions = self._make_session_and_client()
@@ -138,8 +179,9 @@ class TestOpenAIStreaming:
             for _ in gen:
                 pass
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
 
     def test_stream_options_include_usage_auto_injected(self):
         session, wrapped, mock_completions = self._make_session_and_client()
@@ -173,6 +215,23 @@ class TestOpenAIStreaming:
         assert call_kwargs["stream_options"]["custom_key"] == "preserved"
         assert call_kwargs["stream_options"]["include_usage"] is True
 
+    def test_stream_options_caller_dict_not_mutated(self):
+        session, wrapped, mock_completions = self._make_session_and_client()
+        mock_completions.create.return_value = iter([])
+        stream_options = {"custom_key": "preserved"}
+
+        for _ in wrapped.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Hi"}],
+            stream=True,
+            stream_options=stream_options,
+        ):
+            pass
+
+        assert stream_options == {"custom_key": "preserved"}
+        call_kwargs = mock_completions.create.call_args[1]
+        assert call_kwargs["stream_options"] == {"custom_key": "preserved", "include_usage": True}
+
     def test_stream_budget_exceeded_raises_before_api_call(self):
         session, wrapped, mock_completions = self._make_session_and_client(budget_usd=0.000001)
 
@@ -185,6 +244,23 @@ class TestOpenAIStreaming:
 
         mock_completions.create.assert_not_called()
 
+    def test_exhausted_budget_reports_real_estimate(self):
+        captured = []
+        session, wrapped, mock_completions = self._make_session_and_client(
+            budget_usd=0.0, on_budget_exceeded=captured.append
+        )
+        messages = [{"role": "user", "content": "Hi"}]
+
+        result = wrapped.chat.completions.create(
+            model="gpt-4o-mini", messages=messages, stream=True
+        )
+
+        assert result is None
+        assert captured[0].estimated_cost == session._estimator.estimate_chat_completion_cost(
+            model="gpt-4o-mini", messages=messages
+        )
+        mock_completions.create.assert_not_called()
+
     def test_stream_budget_exceeded_callback(self):
         captured = []
         session, wrapped, mock_completions = self._make_session_and_client(
@@ -200,7 +276,7 @@ class TestOpenAIStreaming:
 
         assert result is None
         assert len(captured) == 1
-        assert isinstance(captured[0], BudgetExceededError)
+        assert type(captured[0]) is BudgetExceededError
         mock_completions.create.assert_not_called()
 
 
@@ -211,9 +287,7 @@ class TestOpenAIStreaming:
 class TestAnthropicStreaming:
     def _make_session_and_client(self, budget_usd=5.0, **session_kwargs):
         session = BudgetedSession(budget_usd=budget_usd, **session_kwargs)
-        mock_sdk = Mock()
-        mock_messages = Mock()
-        mock_sdk.messages = mock_messages
+        mock_sdk, mock_messages = _make_sdk("messages", methods=["create"])
         wrapped = session.wrap_anthropic(mock_sdk)
         return session, wrapped, mock_messages
 
@@ -255,8 +329,9 @@ class TestAnthropicStreaming:
         ):
             pass
 
-        assert session.get_total_spent() > 0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent > 0
+        assert reserved == 0.0
 
     def test_stream_early_exit_rolls_back(self):
         session, wrapped, mock_messages = self._make_session_and_client()
@@ -276,8 +351,33 @@ class TestAnthropicStreaming:
         next(gen)
         gen.close()
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
+
+    def test_stream_exit_after_message_delta_commits(self):
+        session, wrapped, mock_messages = self._make_session_and_client()
+        events = [
+            _make_anthropic_event("message_start", input_tokens=10),
+            _make_anthropic_event("message_delta", output_tokens=20),
+            _make_anthropic_event("message_stop"),
+        ]
+        mock_messages.create.return_value = iter(events)
+
+        gen = wrapped.messages.create(
+            model="claude-haiku-4-5",
+            max_tokens=100,
+            messages=[{"role": "user", "content": "Hi"}],
+            stream=True,
+        )
+        # Stop as soon as the usage event has been received
+        next(gen)
+        next(gen)
+        gen.close()
+
+        spent, reserved = session.get_snapshot()
+        assert spent > 0
+        assert reserved == 0.0
 
     def test_stream_exception_rolls_back(self):
         session, wrapped, mock_messages = self._make_session_and_client()
@@ -298,8 +398,9 @@ class TestAnthropicStreaming:
             for _ in gen:
                 pass
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
 
     def test_stream_budget_exceeded_raises_before_api_call(self):
         session, wrapped, mock_messages = self._make_session_and_client(budget_usd=0.000001)
@@ -330,7 +431,7 @@ class TestAnthropicStreaming:
 
         assert result is None
         assert len(captured) == 1
-        assert isinstance(captured[0], BudgetExceededError)
+        assert type(captured[0]) is BudgetExceededError
         mock_messages.create.assert_not_called()
 
 
@@ -341,9 +442,9 @@ class TestAnthropicStreaming:
 class TestGoogleStreaming:
     def _make_session_and_client(self, budget_usd=5.0, **session_kwargs):
         session = BudgetedSession(budget_usd=budget_usd, **session_kwargs)
-        mock_sdk = Mock()
-        mock_models = Mock()
-        mock_sdk.models = mock_models
+        mock_sdk, mock_models = _make_sdk(
+            "models", methods=["generate_content", "generate_content_stream"]
+        )
         wrapped = session.wrap_google(mock_sdk)
         return session, wrapped, mock_models
 
@@ -378,8 +479,9 @@ class TestGoogleStreaming:
         ):
             pass
 
-        assert session.get_total_spent() > 0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent > 0
+        assert reserved == 0.0
 
     def test_stream_early_exit_rolls_back(self):
         session, wrapped, mock_models = self._make_session_and_client()
@@ -396,8 +498,30 @@ class TestGoogleStreaming:
         next(gen)
         gen.close()
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
+
+    def test_stream_exit_before_exhaustion_rolls_back(self):
+        # Every chunk carries usage, so only an exhausted stream commits
+        session, wrapped, mock_models = self._make_session_and_client()
+        chunks = [
+            _make_google_chunk(prompt_token_count=0, candidates_token_count=5),
+            _make_google_chunk(prompt_token_count=10, candidates_token_count=20),
+        ]
+        mock_models.generate_content_stream.return_value = iter(chunks)
+
+        gen = wrapped.models.generate_content_stream(
+            model="gemini-2.0-flash",
+            contents="Hello",
+        )
+        next(gen)
+        next(gen)
+        gen.close()
+
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
 
     def test_stream_exception_rolls_back(self):
         session, wrapped, mock_models = self._make_session_and_client()
@@ -416,8 +540,9 @@ class TestGoogleStreaming:
             for _ in gen:
                 pass
 
-        assert session.get_total_spent() == 0.0
-        assert session.get_reserved() == 0.0
+        spent, reserved = session.get_snapshot()
+        assert spent == 0.0
+        assert reserved == 0.0
 
     def test_stream_budget_exceeded_raises_before_api_call(self):
         session, wrapped, mock_models = self._make_session_and_client(budget_usd=0.000001)
@@ -444,5 +569,5 @@ class TestGoogleStreaming:
 
         assert result is None
         assert len(captured) == 1
-        assert isinstance(captured[0], BudgetExceededError)
+        assert type(captured[0]) is BudgetExceededError
         mock_models.generate_content_stream.assert_not_called()
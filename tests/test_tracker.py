@@ -1,8 +1,9 @@
 """Test spend tracker functionality."""
 
+import pickle
 import pytest
 import threading
-from agent_budget_guard.tracking.tracker import SpendTracker
+from agent_budget_guard.tracking.tracker import SpendTracker, UnlimitedSpendTracker, create_tracker
 from agent_budget_guard.exceptions import BudgetExceededError
 
 
@@ -69,6 +70,39 @@ def test_budget_exceeded_error():
 
     assert exc_info.value.estimated_cost == 6.0
     assert exc_info.value.remaining == 5.0
+    # A refused reservation leaves nothing behind
+    assert tracker.get_reserved() == 0.0
+    assert str(exc_info.value) == (
+        "Estimated cost $6.000000 would exceed remaining budget $5.000000"
+    )
+
+
+def test_budget_exceeded_error_pickles():
+    """Test the lazily formatted error survives a pickle round trip."""
+    error = pickle.loads(pickle.dumps(BudgetExceededError(None, 6.0, 5.0)))
+
+    assert (error.estimated_cost, error.remaining) == (6.0, 5.0)
+    assert "$6.000000" in str(error)
+    assert str(BudgetExceededError("custom", 6.0, 5.0)) == "custom"
+
+
+def test_budget_exceeded_error_args():
+    """Test the amounts are carried in args and show up in repr."""
+    error = BudgetExceededError(None, 6.0, 5.0)
+
+    assert error.args == (None, 6.0, 5.0)
+    assert "6.0" in repr(error) and "5.0" in repr(error)
+
+
+def test_commit_unknown_reservation():
+    """Test committing an unknown or already committed reservation raises."""
+    tracker = SpendTracker(budget_usd=5.0)
+    res = tracker.check_and_reserve(1.0)
+    tracker.commit(res, actual_cost=1.0)
+
+    with pytest.raises(ValueError, match="not found"):
+        tracker.commit(res, actual_cost=1.0)
+    assert tracker.get_spent() == 1.0
 
 
 def test_multiple_reservations():
@@ -92,31 +126,35 @@ def test_multiple_reservations():
     assert tracker.get_remaining() == 4.0
 
 
-def test_thread_safety():
+@pytest.mark.parametrize("n_threads", [2, 8, 10, 32, 128])
+def test_thread_safety(n_threads):
     """Test that tracker is thread-safe."""
-    tracker = SpendTracker(budget_usd=10.0)
+    # Budget for exactly half of the $2 reservations
+    tracker = SpendTracker(budget_usd=float(n_threads))
     successful_reservations = []
     failed_reservations = []
+    # Release every thread at once so they really contend for the lock
+    barrier = threading.Barrier(n_threads)
 
     def try_reserve():
+        barrier.wait()
         try:
             res_id = tracker.check_and_reserve(2.0)
             successful_reservations.append(res_id)
         except BudgetExceededError:
             failed_reservations.append(True)
 
-    # Try to make 10 reservations of $2 each with only $10 budget
-    # Only 5 should succeed
-    threads = [threading.Thread(target=try_reserve) for _ in range(10)]
+    threads = [threading.Thread(target=try_reserve) for _ in range(n_threads)]
     for t in threads:
         t.start()
     for t in threads:
         t.join()
 
-    # Exactly 5 should succeed (10 / 2 = 5)
-    assert len(successful_reservations) == 5
-    assert len(failed_reservations) == 5
-    assert tracker.get_reserved() == 10.0
+    # Exactly half should succeed
+    assert len(successful_reservations) == n_threads // 2
+    assert len(failed_reservations) == n_threads // 2
+    assert len(set(successful_reservations)) == n_threads // 2
+    assert tracker.get_reserved() == float(n_threads)
     assert tracker.get_remaining() == 0.0
 
 
@@ -134,3 +172,169 @@ def test_reset():
     assert tracker.get_spent() == 0.0
     assert tracker.get_reserved() == 0.0
     assert tracker.get_remaining() == 10.0
+
+
+def test_snapshot():
+    """Test snapshot returns budget, spent and reserved together."""
+    tracker = SpendTracker(budget_usd=10.0)
+
+    res = tracker.check_and_reserve(3.0)
+    tracker.commit(res, actual_cost=2.0)
+    tracker.check_and_reserve(1.5)
+
+    assert tracker.snapshot() == (10.0, 2.0, 1.5)
+
+
+def test_mark_fired():
+    """Test mark_fired returns only thresholds that had not fired yet."""
+    tracker = SpendTracker(budget_usd=10.0)
+
+    assert tracker.mark_fired(0b011) == 0b011
+    assert tracker.mark_fired(0b111) == 0b100
+    assert tracker.mark_fired(0b111) == 0
+    assert tracker.get_fired_mask() == 0b111
+
+
+def test_utilization_scale():
+    """Test the utilization scale converts USD to percent of budget."""
+    assert SpendTracker(budget_usd=4.0).get_utilization_scale() == 25.0
+    assert SpendTracker(budget_usd=0.0).get_utilization_scale() == 0.0
+    assert SpendTracker(budget_usd=float("inf")).get_utilization_scale() == 0.0
+
+
+def test_exhausted_budget_refuses_without_lock():
+    """Test an exhausted budget refuses any positive amount on the fast path."""
+    tracker = SpendTracker(budget_usd=1.0)
+    res = tracker.check_and_reserve(1.0)
+    tracker.commit(res, actual_cost=1.0)
+
+    # The lock is never touched on this path
+    tracker._lock = None
+    with pytest.raises(BudgetExceededError) as exc_info:
+        tracker.check_and_reserve(0.25)
+    assert exc_info.value.estimated_cost == 0.25
+    assert exc_info.value.remaining == 0.0
+
+
+def test_small_commits_add_up_exactly():
+    """Test many small commits do not accumulate float rounding error."""
+    tracker = SpendTracker(budget_usd=2.0)
+
+    for _ in range(10):
+        res = tracker.check_and_reserve(0.1)
+        tracker.commit(res, actual_cost=0.1)
+
+    assert tracker.get_spent() == 1.0
+    assert tracker.get_remaining() == 1.0
+
+
+def test_unlimited_budget():
+    """Test an infinite budget never runs out."""
+    tracker = SpendTracker(budget_usd=float("inf"))
+
+    res = tracker.check_and_reserve(1e6)
+    tracker.commit(res, actual_cost=1e6)
+
+    assert tracker.get_remaining() == float("inf")
+    assert tracker.snapshot() == (float("inf"), 1e6, 0.0)
+
+
+def test_reservation_ids_are_not_reused():
+    """Test reservation IDs stay unique after earlier ones are released."""
+    tracker = SpendTracker(budget_usd=10.0)
+    first = tracker.check_and_reserve(1.0)
+    tracker.rollback(first)
+    second = tracker.check_and_reserve(1.0)
+
+    assert isinstance(first, str) and isinstance(second, str)
+    assert second != first
+    # A stale rollback must not release the newer reservation
+    tracker.rollback(first)
+    assert tracker.get_reserved() == 1.0
+
+
+def test_check_and_reserve_many():
+    """Test batch reservations are all-or-nothing."""
+    tracker = SpendTracker(budget_usd=10.0)
+
+    ids = tracker.check_and_reserve_many([2.0, 3.0])
+    assert len(set(ids)) == 2
+    assert tracker.get_reserved() == 5.0
+
+    with pytest.raises(BudgetExceededError) as exc_info:
+        tracker.check_and_reserve_many([3.0, 3.0])
+    assert exc_info.value.estimated_cost == 6.0
+    assert tracker.get_reserved() == 5.0
+
+    tracker.commit(ids[0], actual_cost=1.5)
+    tracker.rollback(ids[1])
+    assert tracker.snapshot() == (10.0, 1.5, 0.0)
+
+
+def test_create_tracker():
+    """Test the factory picks the unlimited tracker only for an infinite budget."""
+    assert type(create_tracker(10.0)) is SpendTracker
+    assert type(create_tracker(float("inf"))) is UnlimitedSpendTracker
+    with pytest.raises(ValueError):
+        create_tracker(-1.0)
+
+
+def test_is_unlimited():
+    """Test only an infinite budget reports itself as unlimited."""
+    assert create_tracker(float("inf")).is_unlimited()
+    assert SpendTracker(budget_usd=float("inf")).is_unlimited()
+    assert not SpendTracker(budget_usd=5.0).is_unlimited()
+    assert not SpendTracker(budget_usd=0.0).is_unlimited()
+
+
+def test_unlimited_tracker_records_spend_only():
+    """Test the unlimited tracker holds no budget but still records spend."""
+    tracker = UnlimitedSpendTracker()
+
+    first, second = tracker.check_and_reserve_many([1e6, 1e6])
+    res = tracker.check_and_reserve(1e6)
+    assert len({first, second, res}) == 3
+    assert tracker.get_reserved() == 0.0
+
+    tracker.commit(res, actual_cost=2.5)
+    tracker.commit(first, actual_cost=0.5)
+    tracker.rollback(second)
+    tracker.rollback(second)
+
+    assert tracker.snapshot() == (float("inf"), 3.0, 0.0)
+    assert tracker.get_remaining() == float("inf")
+
+
+def test_unlimited_tracker_rejects_unknown_reservation():
+    """Test the unlimited tracker keeps the commit contract for bad IDs."""
+    tracker = UnlimitedSpendTracker()
+    res = tracker.check_and_reserve(1.0)
+    tracker.commit(res, actual_cost=1.0)
+
+    with pytest.raises(ValueError, match="not found"):
+        tracker.commit(res, actual_cost=1.0)
+    with pytest.raises(ValueError, match="not found"):
+        tracker.commit("no-such-id", actual_cost=1.0)
+    assert tracker.get_spent() == 1.0
+
+
+def test_refused_amount_retries_until_budget_frees_up():
+    """Test a cached refusal is dropped once the remaining budget grows."""
+    tracker = SpendTracker(budget_usd=5.0)
+    held = tracker.check_and_reserve(4.0)
+
+    for _ in range(2):
+        with pytest.raises(BudgetExceededError) as exc_info:
+            tracker.check_and_reserve(2.0)
+        assert exc_info.value.remaining == 1.0
+
+    # Releasing the held reservation must make the same amount fit again
+    tracker.rollback(held)
+    res = tracker.check_and_reserve(2.0)
+
+    # As must committing for less than was reserved
+    with pytest.raises(BudgetExceededError):
+        tracker.check_and_reserve(3.5)
+    tracker.commit(res, actual_cost=1.0)
+    tracker.check_and_reserve(3.5)
+    assert tracker.snapshot() == (5.0, 1.0, 3.5)